@@ -14,6 +14,7 @@ from datetime import timedelta
 from io import BytesIO
 from types import SimpleNamespace
 from main import run_seating_pipeline
+from seat_map import SeatMap
 
 app = Flask(__name__)
 app.secret_key = 'enhanced_secretkey_2025'
@@ -90,9 +91,13 @@ def init_database():
             allowed_years TEXT,
             allowed_branches TEXT,
             layout_columns INTEGER DEFAULT 6,
-            layout_rows INTEGER DEFAULT 5
+            layout_rows INTEGER DEFAULT 5,
+            seat_map TEXT
         )
     ''')
+    # Tables created before seat maps existed; NULL means a full rectangle
+    if 'seat_map' not in [column[1] for column in cursor.execute('PRAGMA table_info(room_configs)')]:
+        cursor.execute('ALTER TABLE room_configs ADD COLUMN seat_map TEXT')
     cursor.execute('''
         CREATE TABLE IF NOT EXISTS teacher_rooms (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -144,13 +149,32 @@ def init_database():
     conn.commit()
     conn.close()
 
+def parse_seat_map_form(text, layout_rows, layout_columns, capacity):
+    """
+    Seat map drawn in the admin room form. A drawn map decides the capacity (its
+    seat count) and must have the layout size given in the form, so an edited
+    layout is never silently replaced; an empty map keeps the form's values.
+    Returns:
+        (hex bitmap or None, layout_rows, layout_columns, capacity); raises ValueError
+        on a malformed map or one whose size differs from the layout
+    """
+    if not text.strip():
+        return None, layout_rows, layout_columns, capacity
+    seat_map = SeatMap.from_text(text)
+    if (seat_map.rows, seat_map.columns) != (layout_rows, layout_columns):
+        raise ValueError(
+            f"the map has {seat_map.rows} rows of {seat_map.columns} columns but the layout is "
+            f"{layout_rows} rows of {layout_columns} columns; make them match or clear the map"
+        )
+    return seat_map.to_hex(), seat_map.rows, seat_map.columns, seat_map.capacity
+
 def get_rooms_config_from_db():
     """Get room configurations from database in the format expected by main.py"""
     conn = sqlite3.connect(DB_PATH)
     cursor = conn.cursor()
     cursor.execute('''
         SELECT room_name, capacity, max_subjects, max_branches, allowed_years, 
-               allowed_branches, layout_columns, layout_rows 
+               allowed_branches, layout_columns, layout_rows, seat_map 
         FROM room_configs ORDER BY room_name
     ''')
     rooms_data = cursor.fetchall()
@@ -166,7 +190,8 @@ def get_rooms_config_from_db():
             'allowed_years': [int(y) for y in row[4].split(',') if y.strip()] if row[4] else [],
             'allowed_branches': row[5].split(',') if row[5] else [],
             'layout_columns': row[6] or 6,
-            'layout_rows': row[7] or 5
+            'layout_rows': row[7] or 5,
+            'seat_map': row[8]
         }
         rooms_config.append(room_config)
     
@@ -230,10 +255,16 @@ df_students = load_student_data()
 
 # Import functions from main.py with fallback
 try:
-    from main import get_colored_groups, extract_student_metadata, assign_rooms_to_groups, assign_seats_in_room, create_index_page, create_simple_html_visualization
+    from main import get_colored_groups, extract_student_metadata, create_index_page, COLORING_STRATEGIES, FIT_POLICIES, SEARCH_TIME_LIMIT
+    from sessions import split_sessions, session_tasks, solve_sessions, session_room_key, room_of, room_tasks, solve_rooms
+    from visualization import create_simple_html_visualization
 except ImportError:
     print("Error: main.py not found or functions not importable.")
-    get_colored_groups = extract_student_metadata = assign_rooms_to_groups = assign_seats_in_room = create_index_page = create_simple_html_visualization = None
+    get_colored_groups = extract_student_metadata = create_index_page = create_simple_html_visualization = None
+    split_sessions = session_tasks = solve_sessions = session_room_key = room_of = room_tasks = solve_rooms = None
+    COLORING_STRATEGIES = {}
+    FIT_POLICIES = ()
+    SEARCH_TIME_LIMIT = None
 
 # Routes
 @app.route('/')
@@ -777,27 +808,34 @@ def admin_add_room_config():
         allowed_branches = request.form.getlist('allowed_branches')
         layout_columns = int(request.form.get('layout_columns', 6))
         layout_rows = int(request.form.get('layout_rows', 5))
+        try:
+            seat_map, layout_rows, layout_columns, capacity = parse_seat_map_form(
+                request.form.get('seat_map', ''), layout_rows, layout_columns, capacity
+            )
+        except ValueError as e:
+            flash(f'Invalid seat map: {e}', 'danger')
+            return redirect(url_for('admin_rooms_config'))
 
         conn = sqlite3.connect(DB_PATH)
         cursor = conn.cursor()
         try:
             cursor.execute('''
                 INSERT INTO room_configs 
-                (room_name, capacity, max_subjects, max_branches, allowed_years, allowed_branches, layout_columns, layout_rows)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                (room_name, capacity, max_subjects, max_branches, allowed_years, allowed_branches, layout_columns, layout_rows, seat_map)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
             ''', (room_name, capacity, 
                   max_subjects if max_subjects else None, 
                   max_branches if max_branches else None,
                   ','.join(allowed_years), 
                   ','.join(allowed_branches),
-                  layout_columns, layout_rows))
+                  layout_columns, layout_rows, seat_map))
             conn.commit()
             flash('Room configuration added successfully!', 'success')
         except sqlite3.IntegrityError:
             flash('Room name already exists.', 'danger')
         conn.close()
         return redirect(url_for('admin_rooms_config'))
-    return render_template('admin_add_room_config.html')
+    return render_template('admin_add_room.html')
 
 @app.route('/admin/edit_room_config/<int:room_id>', methods=['GET', 'POST'])
 @require_admin
@@ -812,18 +850,26 @@ def admin_edit_room_config(room_id):
         allowed_branches = request.form.getlist('allowed_branches')
         layout_columns = int(request.form.get('layout_columns', 6))
         layout_rows = int(request.form.get('layout_rows', 5))
+        try:
+            seat_map, layout_rows, layout_columns, capacity = parse_seat_map_form(
+                request.form.get('seat_map', ''), layout_rows, layout_columns, capacity
+            )
+        except ValueError as e:
+            conn.close()
+            flash(f'Invalid seat map: {e}', 'danger')
+            return redirect(url_for('admin_edit_room_config', room_id=room_id))
 
         cursor.execute('''
             UPDATE room_configs SET 
             capacity = ?, max_subjects = ?, max_branches = ?, 
-            allowed_years = ?, allowed_branches = ?, layout_columns = ?, layout_rows = ?
+            allowed_years = ?, allowed_branches = ?, layout_columns = ?, layout_rows = ?, seat_map = ?
             WHERE id = ?
         ''', (capacity, 
               max_subjects if max_subjects else None, 
               max_branches if max_branches else None,
               ','.join(allowed_years), 
               ','.join(allowed_branches),
-              layout_columns, layout_rows, room_id))
+              layout_columns, layout_rows, seat_map, room_id))
         conn.commit()
         flash('Room configuration updated successfully!', 'success')
         conn.close()
@@ -843,7 +889,8 @@ def admin_edit_room_config(room_id):
             'allowed_years': room[5].split(',') if room[5] else [],
             'allowed_branches': room[6].split(',') if room[6] else [],
             'layout_columns': room[7] if len(room) > 7 else 6,
-            'layout_rows': room[8] if len(room) > 8 else 5
+            'layout_rows': room[8] if len(room) > 8 else 5,
+            'seat_map': SeatMap.from_hex(room[8], room[7], room[9]).to_text() if len(room) > 9 and room[9] else ''
         }
         return render_template('admin_edit_room_config.html', room=room_dict)
     else:
@@ -926,8 +973,8 @@ def get_student_seating_info(student_id):
         print(f"DEBUG: Exports directory '{exports_dir}' does not exist")
         return None
     
-    # Look for all CSV files in exports directory
-    csv_files = glob.glob(os.path.join(exports_dir, "*_seating.csv"))
+    # Look for all CSV files in exports directory, including the per-session folders
+    csv_files = glob.glob(os.path.join(exports_dir, "**", "*_seating.csv"), recursive=True)
     
     if not csv_files:
         print(f"DEBUG: No seating CSV files found in '{exports_dir}' directory")
@@ -972,6 +1019,9 @@ def get_room_seating_data(room_name):
     """
     exports_dir = 'exports'
     csv_file = os.path.join(exports_dir, f"{room_name}_seating.csv")
+    # room_name may be "<session>/<room>", but must stay inside exports/
+    if os.path.commonpath([os.path.abspath(csv_file), os.path.abspath(exports_dir)]) != os.path.abspath(exports_dir):
+        return None
     
     if os.path.exists(csv_file):
         try:
@@ -982,6 +1032,29 @@ def get_room_seating_data(room_name):
     
     return None
 
+# Per-session metadata rebuilt on the server from df_students, so the cookie-backed
+# session only holds the dataset-wide copy; reset whenever df_students is replaced
+_session_metadata_cache = {'source': None, 'metadata': {}}
+
+def session_metadata(label):
+    """Metadata of one exam session's rows, or None when df_students has no such session"""
+    if _session_metadata_cache['source'] is not df_students:
+        metadata = {}
+        if split_sessions is not None and not df_students.empty:
+            for session_label, rows in split_sessions(df_students).items():
+                metadata[session_label] = extract_student_metadata(rows).to_dict()
+        _session_metadata_cache.update(source=df_students, metadata=metadata)
+    return _session_metadata_cache['metadata'].get(label)
+
+def room_metadata(room_key):
+    """
+    Metadata of the exam session a layout key ("<session>/<room>") belongs to, so a
+    student sitting several sessions shows that session's subject, date and time;
+    plain room names fall back to the whole dataset
+    """
+    label = room_key.rpartition('/')[0]
+    return (label and session_metadata(label)) or session.get('student_metadata') or {}
+
 def refresh_seating_exports():
     """
     Regenerate all seating CSV exports from current session data
@@ -1002,9 +1075,10 @@ def refresh_seating_exports():
             continue
             
         room_data = []
+        room_info = room_metadata(room_name)
         for seat in room_seats:
             student_id = seat['student_id']
-            info = student_metadata.get(student_id, {})
+            info = room_info.get(student_id, {})
             room_data.append({
                 'StudentID': student_id,
                 'Name': info.get('Name', 'Unknown'),
@@ -1023,6 +1097,7 @@ def refresh_seating_exports():
         if room_data:
             df = pd.DataFrame(room_data)
             csv_path = os.path.join(exports_dir, f"{room_name}_seating.csv")
+            os.makedirs(os.path.dirname(csv_path), exist_ok=True)
             df.to_csv(csv_path, index=False)
             print(f"Updated {csv_path}")
     
@@ -1162,26 +1237,70 @@ def process_seating_plan():
         flash('No room configurations found. Please configure rooms in the admin dashboard.', 'danger')
         return redirect(url_for('teacher_dashboard'))
 
+    coloring_strategy = request.form.get('coloring_strategy', 'dsatur')
+    if coloring_strategy not in COLORING_STRATEGIES:
+        flash(f'Unknown coloring strategy: {coloring_strategy}', 'danger')
+        return redirect(url_for('teacher_dashboard'))
+
+    fit_policy = request.form.get('fit_policy', 'worst_fit')
+    if fit_policy not in FIT_POLICIES:
+        flash(f'Unknown fit policy: {fit_policy}', 'danger')
+        return redirect(url_for('teacher_dashboard'))
+
+    # Seconds the exact room search may run per session; blank keeps the default
+    time_limit = request.form.get('time_limit', type=float) or SEARCH_TIME_LIMIT
+    if time_limit is not None and time_limit <= 0:
+        flash('The search time limit must be a positive number of seconds.', 'danger')
+        return redirect(url_for('teacher_dashboard'))
+
+    # Processes for coloring components and solving sessions/rooms; blank uses the CPU count
+    workers = request.form.get('workers', type=int)
+    if workers is not None and workers <= 0:
+        flash('The number of workers must be a positive integer.', 'danger')
+        return redirect(url_for('teacher_dashboard'))
+
     try:
         # Step 1: Extract student metadata
         student_metadata = extract_student_metadata(df_students)
         print("✅ Student metadata extracted.")
 
         # Step 2: Get colored groups (conflict resolution)
-        colored_groups = get_colored_groups(student_metadata)
+        colored_groups = get_colored_groups(df_students, workers=workers, strategy=coloring_strategy)
         print(f"✅ Generated {len(colored_groups)} conflict-free groups.")
 
-        # Step 3: Assign rooms to groups
-        room_assignments = assign_rooms_to_groups(colored_groups, student_metadata, current_rooms_config)
-        print("✅ Rooms assigned to groups.")
-
-        # Step 4: Assign seats within rooms
-        final_seating_layout = assign_seats_in_room(room_assignments, student_metadata, {r['room_name']:r for r in current_rooms_config})
-        print("✅ Seats assigned within rooms.")
+        # Steps 3-4: Assign rooms and seats per exam session, every session using all rooms;
+        # the plan published last is repaired so that only displaced students move
+        previous = {}
+        for key, seats in (session.get('final_seating_layout') or {}).items():
+            label, _, room_name = key.rpartition('/')
+            previous.setdefault(label, {})[room_name] = [seat['student_id'] for seat in seats]
+        sessions = split_sessions(df_students)
+        tasks = list(session_tasks(colored_groups, sessions))
+        metadata_of = {label: task_metadata for label, _, task_metadata in tasks}
+        _session_metadata_cache.update(source=df_students, metadata={label: metadata_of[label].to_dict() for label in sessions})
+        outcomes = dict(solve_sessions(tasks, current_rooms_config, fit_policy, workers, previous, time_limit))
+        seat_work = []
+        unplaced = []
+        for label in sessions:
+            if outcomes[label]['error']:
+                if not outcomes[label]['unplaced']:
+                    raise ValueError(f"session {label}: {outcomes[label]['error']}")
+                # The search ran out of budget: keep its partial plan, its students are listed below
+                flash(f"Session {label}: {outcomes[label]['error']}. The best partial plan is shown.", 'warning')
+            unplaced.extend(outcomes[label]['unplaced'])
+            # Exports below use this page's own CSV format, so rooms are only seated here
+            seat_work.extend(room_tasks(label, outcomes[label]['rooms'], metadata_of[label], current_rooms_config, export=False, render=False))
+        final_seating_layout = {}
+        for task, outcome in solve_rooms(seat_work, workers):
+            if outcome['error']:
+                raise ValueError(f"session {task['label']} room {task['room']}: {outcome['error']}")
+            final_seating_layout[session_room_key(task['label'], task['room'])] = outcome['seats']
+            unplaced.extend(outcome['unplaced'])
+        print(f"✅ Rooms and seats assigned for {len(sessions)} exam sessions.")
 
         # Store results in session
         session['final_seating_layout'] = final_seating_layout
-        session['student_metadata'] = student_metadata
+        session['student_metadata'] = student_metadata.to_dict()
         session['rooms_config_for_seating'] = current_rooms_config
 
         # Step 5: Automatically generate CSV exports
@@ -1193,9 +1312,10 @@ def process_seating_plan():
         for room_name, seats in final_seating_layout.items():
             if seats:  # Only export rooms with students
                 room_data = []
+                room_info = room_metadata(room_name)
                 for seat in seats:
                     student_id = seat['student_id']
-                    info = student_metadata.get(student_id, {})
+                    info = room_info.get(student_id, {})
                     room_data.append({
                         'StudentID': student_id,
                         'Name': info.get('Name', 'Unknown'),
@@ -1214,11 +1334,15 @@ def process_seating_plan():
                 if room_data:
                     df_export = pd.DataFrame(room_data)
                     csv_path = os.path.join(exports_dir, f"{room_name}_seating.csv")
+                    os.makedirs(os.path.dirname(csv_path), exist_ok=True)
                     df_export.to_csv(csv_path, index=False)
                     exported_rooms.append(room_name)
                     print(f"✅ Exported {room_name} with {len(room_data)} students")
         
         print(f"✅ Generated CSV exports for {len(exported_rooms)} rooms: {exported_rooms}")
+        if unplaced:
+            flash(f"{len(unplaced)} students could not be seated: {', '.join(entry['student_id'] for entry in unplaced)}. "
+                  "Add seats or rooms that allow them.", 'warning')
         flash(f'Seating plan generated successfully! CSV exports created for {len(exported_rooms)} rooms.', 'success')
         return redirect(url_for('view_seating_results'))
 
@@ -1270,7 +1394,7 @@ def api_refresh_seating_exports():
             'message': 'No seating data available to export'
         })
 
-@app.route('/api/room_students/<room_name>')
+@app.route('/api/room_students/<path:room_name>')
 @require_login  
 def api_get_room_students(room_name):
     """
@@ -1324,15 +1448,16 @@ def view_seating_results():
     os.makedirs(output_dir, exist_ok=True)
 
     for room_name, seats in final_seating_layout.items():
-        room_config = next((r for r in rooms_config_for_seating if r['room_name'] == room_name), None)
+        room_config = next((r for r in rooms_config_for_seating if r['room_name'] == room_of(room_name)), None)
         if room_config and seats:
             html_content = create_simple_html_visualization(
                 room_name=room_name,
                 seating_arrangement=seats,
-                metadata=student_metadata,
+                metadata=room_metadata(room_name),
                 room_config=room_config
             )
             html_filename = f"{room_name}.html"
+            os.makedirs(os.path.dirname(os.path.join(output_dir, html_filename)), exist_ok=True)
             with open(os.path.join(output_dir, html_filename), "w") as f:
                 f.write(html_content)
             visualization_links.append({'room_name': room_name, 'url': url_for('static_html', filename=html_filename)})
@@ -1340,9 +1465,9 @@ def view_seating_results():
     # Create index page
     room_names_list = [link['room_name'] for link in visualization_links]
     if room_names_list:
-        index_html_content = create_index_page(room_names_list, final_seating_layout, student_metadata)
-        with open(os.path.join(output_dir, "index.html"), "w") as f:
-            f.write(index_html_content)
+        create_index_page(room_names_list, final_seating_layout, student_metadata,
+                          output_path=os.path.join(output_dir, "index.html"),
+                          room_metadata={room_name: room_metadata(room_name) for room_name in room_names_list})
         visualization_links.append({'room_name': 'Overall Dashboard', 'url': url_for('static_html', filename='index.html')})
 
     return render_template('seating_results.html', visualization_links=visualization_links)
@@ -1351,7 +1476,7 @@ def view_seating_results():
 def static_html(filename):
     return send_from_directory('visualizations', filename)
 
-@app.route('/export_room_csv/<room_name>')
+@app.route('/export_room_csv/<path:room_name>')
 @require_teacher
 def export_room_csv(room_name):
     final_seating_layout = session.get('final_seating_layout')
@@ -1367,9 +1492,10 @@ def export_room_csv(room_name):
         return redirect(url_for('view_seating_results'))
 
     room_data = []
+    room_info = room_metadata(room_name)
     for seat in room_seats:
         student_id = seat['student_id']
-        info = student_metadata.get(student_id, {})
+        info = room_info.get(student_id, {})
         room_data.append({
             'StudentID': student_id,
             'Name': info.get('Name', 'Unknown'),
@@ -1389,6 +1515,7 @@ def export_room_csv(room_name):
     exports_dir = 'exports'
     os.makedirs(exports_dir, exist_ok=True)
     csv_path = os.path.join(exports_dir, f"{room_name}_seating.csv")
+    os.makedirs(os.path.dirname(csv_path), exist_ok=True)
     df.to_csv(csv_path, index=False)
 
     return send_from_directory(exports_dir, f"{room_name}_seating.csv", as_attachment=True)
@@ -1399,7 +1526,7 @@ def get_student_details(student_id):
     metadata = session.get('student_metadata')
     if not metadata:
         df = load_student_data()
-        metadata = extract_student_metadata(df)
+        metadata = extract_student_metadata(df).to_dict()
         session['student_metadata'] = metadata
 
     student_info = metadata.get(student_id)
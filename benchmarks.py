@@ -0,0 +1,474 @@
+"""
+Performance benchmarks for the seating pipeline.
+
+Usage:
+    python benchmarks.py dsatur [--sizes 10000 100000 1000000] [--degree 4] [--rescan-limit 10000]
+    python benchmarks.py strategies [--sizes 1000 3000] [--degree 16] [--tabu-seconds 2]
+    python benchmarks.py slots [--students 2000 5000 40000] [--slots 40] [--exams 5] [--csr-limit 5000]
+    python benchmarks.py memory [--sizes 100000 1000000]
+    python benchmarks.py backtracking [--groups 200] [--rooms 60] [--slack 2] [--seeds 0 1 ... 11] [--time-limit 10] [--symmetric]
+    python benchmarks.py ffd [--groups 2000] [--rooms 100 300 1000]
+    python benchmarks.py flow [--groups 2000] [--rooms 100 300 1000] [--spare 0.05]
+    python benchmarks.py seats [--rows 20] [--columns 40] [--fill 1.0 0.75] [--subjects 3 8] [--branches 4]
+"""
+import argparse
+import contextlib
+import gc
+import io
+import random
+import time
+import tracemalloc
+import networkx as nx
+import pandas as pd
+from conflict_graph import (
+    COLORING_STRATEGIES, build_conflict_csr, build_slot_cliques, clique_dsatur_coloring, dsatur_coloring,
+    dsatur_coloring_rescan, tabu_coloring
+)
+from room_assignment import (
+    FIT_POLICIES, ConstraintBits, RoomConfig, Student, _popcount, backtracking_assign_sets, first_fit_decreasing,
+    flow_assign, search_room_assignment, summarize_groups
+)
+from seat_layout import place_students
+from sparse_graph import CSRGraph
+
+def random_conflict_graph(num_nodes, avg_degree, seed=0):
+    """Random graph with num_nodes nodes and about avg_degree neighbours per node"""
+    rng = random.Random(seed)
+    G = nx.Graph()
+    G.add_nodes_from(range(num_nodes))
+    num_edges = num_nodes * avg_degree // 2
+    G.add_edges_from(
+        (rng.randrange(num_nodes), rng.randrange(num_nodes)) for _ in range(num_edges)
+    )
+    return G
+
+def random_enrollments(num_students, num_slots, exams_per_student, seed=0):
+    """Synthetic students.csv rows: every student sits several random exam slots"""
+    rng = random.Random(seed)
+    rows = []
+    for i in range(num_students):
+        for slot in rng.sample(range(num_slots), exams_per_student):
+            rows.append({
+                'StudentID': f"S{i}",
+                'ExamDate': f"2025-06-{slot // 2 + 1:02d}",
+                'ExamTime': 'Morning' if slot % 2 == 0 else 'Afternoon'
+            })
+    return pd.DataFrame(rows)
+
+def benchmark_dsatur(sizes, avg_degree, rescan_limit, seed=0):
+    """Compare the heap-based DSatur (networkx and CSR input) against the original full-rescan version"""
+    print(f"{'nodes':>10} {'edges':>10} {'colors':>7} {'heap (s)':>10} {'csr (s)':>8} {'rescan (s)':>11} {'same':>5}")
+    for num_nodes in sizes:
+        G = random_conflict_graph(num_nodes, avg_degree, seed)
+
+        start = time.perf_counter()
+        colors = dsatur_coloring(G)
+        heap_time = time.perf_counter() - start
+        num_colors = max(colors.values()) + 1 if colors else 0
+
+        csr = CSRGraph.from_networkx(G)
+        start = time.perf_counter()
+        dsatur_coloring(csr)
+        csr_time = time.perf_counter() - start
+
+        if num_nodes <= rescan_limit:
+            start = time.perf_counter()
+            rescan_colors = dsatur_coloring_rescan(G)
+            rescan_time = f"{time.perf_counter() - start:.3f}"
+            same = 'yes' if list(rescan_colors.items()) == list(colors.items()) else 'NO'
+        else:
+            rescan_time, same = 'skipped', '-'
+
+        print(f"{num_nodes:>10} {G.number_of_edges():>10} {num_colors:>7} {heap_time:>10.3f} {csr_time:>8.3f} {rescan_time:>11} {same:>5}")
+
+def _measure(strategy, graph):
+    """Wall time of one run, then peak traced memory of a second run"""
+    start = time.perf_counter()
+    colors = strategy(graph)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    strategy(graph)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return colors, elapsed, peak
+
+def benchmark_strategies(sizes, avg_degree, tabu_seconds, seed=0):
+    """Wall time, peak memory and number of colors of every coloring strategy"""
+    strategies = dict(COLORING_STRATEGIES)
+    strategies['tabu'] = lambda graph: tabu_coloring(graph, time_limit=tabu_seconds, seed=seed)
+
+    inputs = []
+    for num_nodes in sizes:
+        inputs.append((f"random n={num_nodes}", CSRGraph.from_networkx(random_conflict_graph(num_nodes, avg_degree, seed))))
+        enrollments = random_enrollments(num_nodes, num_slots=40, exams_per_student=3, seed=seed)
+        inputs.append((f"slots n={num_nodes}", build_conflict_csr(enrollments)))
+
+    print(f"{'input':<18} {'edges':>10} {'strategy':<13} {'colors':>7} {'time (s)':>9} {'peak (MB)':>10}")
+    for label, graph in inputs:
+        for name, strategy in strategies.items():
+            colors, elapsed, peak = _measure(strategy, graph)
+            num_colors = max(colors.values()) + 1 if colors else 0
+            print(f"{label:<18} {graph.num_edges:>10} {name:<13} {num_colors:>7} {elapsed:>9.3f} {peak / 2**20:>10.1f}")
+
+def benchmark_slots(student_counts, num_slots, exams_per_student, csr_limit, seed=0):
+    """Clique DSatur on slot enrollments where every student sits several exams, against DSatur on the explicit graph"""
+    print(f"{'students':>9} {'rows':>8} {'edges':>11} {'colors':>7} {'cliques (s)':>12} {'csr (s)':>8} {'same':>5}")
+    for num_students in student_counts:
+        enrollments = random_enrollments(num_students, num_slots, exams_per_student, seed)
+        nodes, cliques = build_slot_cliques(enrollments)
+        start = time.perf_counter()
+        colors = clique_dsatur_coloring(nodes, cliques)
+        clique_time = time.perf_counter() - start
+        num_colors = max(colors.values()) + 1 if colors else 0
+
+        if num_students <= csr_limit:
+            graph = CSRGraph.from_cliques(nodes, cliques)
+            start = time.perf_counter()
+            reference = dsatur_coloring(graph)
+            csr_time = f"{time.perf_counter() - start:.2f}"
+            edges = graph.num_edges
+            same = 'yes' if list(reference.items()) == list(colors.items()) else 'NO'
+        else:
+            csr_time, edges, same = 'skipped', '-', '-'
+        print(f"{num_students:>9} {len(enrollments):>8} {edges:>11} {num_colors:>7} {clique_time:>12.2f} {csr_time:>8} {same:>5}")
+
+class DictStudent:
+    """Student record as it was before __slots__ and interning, for comparison"""
+
+    def __init__(self, student_id, metadata):
+        self.id = student_id
+        self.year = int(metadata.get('Year'))
+        self.subject = metadata.get('Subject')
+        self.department = metadata.get('Department')
+        self.branch = metadata.get('Branch', metadata.get('Batch', 'Unknown'))
+        self.batch = metadata.get('Batch', 'Unknown')
+
+def _metadata_row(i):
+    # Fresh string objects per row, as produced by parsing a CSV row by row
+    return {
+        'Year': str(2 + i % 3),
+        'Subject': ''.join(['Subject-', str(i % 40)]),
+        'Department': ''.join(['Dept-', str(i % 8)]),
+        'Branch': ''.join(['Branch-', str(i % 12)]),
+        'Batch': ''.join(['20', str(22 + i % 3)])
+    }
+
+def _retained_bytes(record_class, num_students):
+    """Bytes still allocated after building num_students records and dropping their metadata"""
+    gc.collect()
+    tracemalloc.start()
+    students = [record_class(f"S{i}", _metadata_row(i)) for i in range(num_students)]
+    gc.collect()
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del students
+    return retained
+
+def benchmark_memory(sizes):
+    """Per-student footprint of the room-assignment Student record before and after"""
+    print(f"{'students':>10} {'dict (B/student)':>17} {'slotted (B/student)':>20} {'saving':>7}")
+    for num_students in sizes:
+        before = _retained_bytes(DictStudent, num_students) / num_students
+        after = _retained_bytes(Student, num_students) / num_students
+        print(f"{num_students:>10} {before:>17.0f} {after:>20.0f} {1 - after / before:>7.0%}")
+
+def random_room_instance(num_groups, num_rooms, slack, seed=0):
+    """
+    Color groups and rooms with a planted solution: groups are dealt round-robin to
+    rooms, each room gets that load plus up to slack spare seats and one spare subject,
+    and the room list is shuffled so the search has to find the packing again.
+    """
+    rng = random.Random(seed)
+    groups, load, subjects = {}, [0] * num_rooms, [set() for _ in range(num_rooms)]
+    next_id = 0
+    for color in range(num_groups):
+        r = color % num_rooms
+        size = rng.randint(3, 12)
+        subject = f"Subject-{rng.randrange(20)}"
+        groups[color] = [
+            Student(f"S{next_id + i}", {'Year': 2 + r % 3, 'Subject': subject, 'Department': 'CSE', 'Branch': f"Branch-{rng.randrange(8)}"})
+            for i in range(size)
+        ]
+        next_id += size
+        load[r] += size
+        subjects[r].add(subject)
+
+    rooms = [
+        RoomConfig({
+            'room_name': f"R{r}",
+            'capacity': load[r] + rng.randint(0, slack),
+            'max_subjects': len(subjects[r]) + 1,
+            'max_branches': 0,
+            'allowed_years': [2 + r % 3]
+        })
+        for r in range(num_rooms)
+    ]
+    rng.shuffle(rooms)
+    return groups, rooms
+
+def symmetric_room_instance(num_groups, num_rooms, seed=0):
+    """
+    Campus-style instance: rooms come in three interchangeable kinds and groups are
+    drawn from a handful of sizes, years and subjects, so many rooms and groups are
+    identical and a search that ignores this revisits the same states over and over.
+    """
+    rng = random.Random(seed)
+    groups, next_id = {}, 0
+    for color in range(num_groups):
+        size = rng.choice([16, 13, 11, 7])
+        year, subject = rng.choice([2, 3, 4]), f"Subject-{rng.randrange(4)}"
+        groups[color] = [
+            Student(f"S{next_id + i}", {'Year': year, 'Subject': subject, 'Department': 'CSE', 'Branch': f"Branch-{rng.randrange(2)}"})
+            for i in range(size)
+        ]
+        next_id += size
+
+    rooms = [
+        RoomConfig({
+            'room_name': f"R{r}",
+            'capacity': 30,
+            'max_subjects': 2,
+            'max_branches': 0,
+            'allowed_years': [[2, 3], [3, 4], [2, 4]][r % 3]
+        })
+        for r in range(num_rooms)
+    ]
+    return groups, rooms
+
+def _quiet(assign, groups, rooms):
+    """Wall time and result of one call with the summary and search progress printing suppressed"""
+    with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+        start = time.perf_counter()
+        result = assign(groups, rooms)
+        return time.perf_counter() - start, result
+
+def _summarized_search(groups, rooms, time_limit):
+    """search_room_assignment including the group summaries it needs, as assign_rooms_to_groups runs it"""
+    bits = ConstraintBits()
+    return search_room_assignment(summarize_groups(groups, bits), rooms, bits, time_limit)
+
+def _budgeted_sets_search(groups, rooms, time_limit):
+    """backtracking_assign_sets as (assignment or None when out of time, nodes visited)"""
+    stats = {}
+    try:
+        return backtracking_assign_sets(groups, rooms, time_limit, stats), stats['nodes']
+    except TimeoutError:
+        return None, stats['nodes']
+
+def benchmark_backtracking(num_groups, num_rooms, seeds, slack, symmetric=False, time_limit=10.0):
+    """
+    Bitmask/trail backtracking search against the original set-copying one, both with
+    the same time budget. When both finish the speedup is the wall-time ratio; when
+    only the bitmask search does it is a lower bound (>); when neither does, the
+    instance is reported as out of budget with the ratio of nodes searched per second
+    (/node), since the two searches visit the same tree.
+    """
+    print(f"{'seed':>5} {'groups':>7} {'rooms':>6} {'bitmask (s)':>12} {'nodes':>9} "
+          f"{'sets (s)':>9} {'nodes':>9} {'speedup':>11} {'same':>5}")
+    for seed in seeds:
+        if symmetric:
+            groups, rooms = symmetric_room_instance(num_groups, num_rooms, seed)
+        else:
+            groups, rooms = random_room_instance(num_groups, num_rooms, slack, seed)
+        new_time, new_result = _quiet(lambda g, r: _summarized_search(g, r, time_limit), groups, rooms)
+        old_time, (old_result, old_nodes) = _quiet(lambda g, r: _budgeted_sets_search(g, r, time_limit), groups, rooms)
+        new_nodes = new_result.stats.nodes
+        if new_result.stats.status == 'budget':
+            speedup = f"{(new_nodes / new_time) / (old_nodes / old_time):.1f}x/node"
+            same = 'budget'
+        elif old_result is None:
+            speedup, same = f">{old_time / new_time:.1f}x", '-'
+        else:
+            speedup = f"{old_time / new_time:.1f}x"
+            same = 'yes' if (new_result.assignments if new_result.complete else None) == old_result else 'NO'
+        print(f"{seed:>5} {num_groups:>7} {num_rooms:>6} {new_time:>12.4f} {new_nodes:>9} "
+              f"{old_time:>9.4f} {old_nodes:>9} {speedup:>11} {same:>5}")
+
+def sorted_rooms_ffd(groups, rooms, bits):
+    """FFD as it was before RoomPool: every group re-sorts all rooms by remaining seats"""
+    remaining = {room.room_id: room.capacity for room in rooms}
+    subjects = {room.room_id: 0 for room in rooms}
+    allowed = {room.room_id: bits.room_years(room) for room in rooms}
+    assignments = {}
+    for group in sorted(groups, key=lambda x: x.size, reverse=True):
+        for room in sorted(rooms, key=lambda x: remaining[x.room_id], reverse=True):
+            rid = room.room_id
+            if group.size > remaining[rid] or group.year_mask & ~allowed[rid]:
+                continue
+            if room.max_subjects > 0 and _popcount(subjects[rid] | group.subject_mask) > room.max_subjects:
+                continue
+            remaining[rid] -= group.size
+            subjects[rid] |= group.subject_mask
+            assignments.setdefault(rid, []).extend(group.student_ids)
+            break
+        else:
+            return None
+    return assignments
+
+def benchmark_ffd(num_groups, room_counts, seed=0):
+    """Greedy placement with the indexed RoomPool (every policy) against re-sorting rooms per group"""
+    print(f"{'rooms':>6} {'groups':>7} {'sorted (s)':>11} " + ' '.join(f"{policy + ' (s)':>14}" for policy in FIT_POLICIES) + f" {'same':>5}")
+    for num_rooms in room_counts:
+        rng = random.Random(seed)
+        groups = {
+            color: [
+                Student(f"S{color}-{i}", {'Year': year, 'Subject': f"Subject-{rng.randrange(30)}", 'Department': 'CSE'})
+                for i in range(rng.randint(1, 10))
+            ]
+            for color, year in ((color, rng.choice([2, 3, 4])) for color in range(num_groups))
+        }
+        seats_needed = sum(len(group) for group in groups.values())
+        rooms = [
+            RoomConfig({
+                'room_name': f"R{r}",
+                'capacity': int(1.5 * seats_needed / num_rooms) + 1,
+                'max_subjects': rng.choice([0, 0, 0, 12]),
+                'max_branches': 0,
+                'allowed_years': rng.choice([[2, 3, 4], [2, 3], [3, 4]])
+            })
+            for r in range(num_rooms)
+        ]
+        bits = ConstraintBits()
+        summaries = summarize_groups(groups, bits)
+
+        start = time.perf_counter()
+        reference = sorted_rooms_ffd(summaries, rooms, bits)
+        sorted_time = time.perf_counter() - start
+
+        times, results = [], {}
+        for policy in FIT_POLICIES:
+            elapsed, results[policy] = _quiet(lambda g, r: first_fit_decreasing(g, r, bits, policy), summaries, rooms)
+            times.append(elapsed)
+        same = 'yes' if results['worst_fit'] == reference else 'NO'
+        print(f"{num_rooms:>6} {num_groups:>7} {sorted_time:>11.3f} " + ' '.join(f"{t:>14.3f}" for t in times) + f" {same:>5}")
+
+def _max_fill(assignment, rooms):
+    if assignment is None:
+        return float('nan')
+    return max(len(assignment.get(room.room_id, [])) / room.capacity for room in rooms)
+
+def benchmark_flow(num_groups, room_counts, spare, seed=0):
+    """Uncapped rooms: greedy placement of whole groups against the balanced max-flow"""
+    print(f"{'rooms':>6} {'students':>9} {'ffd (s)':>8} {'ffd fill':>9} {'flow (s)':>9} {'flow fill':>10}")
+    for num_rooms in room_counts:
+        rng = random.Random(seed)
+        groups = {
+            color: [Student(f"S{color}-{i}", {'Year': rng.choice([2, 3, 4]), 'Subject': 'DSA'}) for i in range(rng.randint(1, 10))]
+            for color in range(num_groups)
+        }
+        seats_needed = sum(len(group) for group in groups.values())
+        rooms = [
+            RoomConfig({
+                'room_name': f"R{r}",
+                'capacity': int((1 + spare) * seats_needed / num_rooms) + 1,
+                'max_subjects': 0,
+                'max_branches': 0,
+                'allowed_years': rng.choice([[2, 3, 4], [2, 3], [3, 4]])
+            })
+            for r in range(num_rooms)
+        ]
+        bits = ConstraintBits()
+        summaries = summarize_groups(groups, bits)
+        by_year = {}
+        for group in groups.values():
+            for student in group:
+                by_year.setdefault(student.year, []).append(student.id)
+
+        ffd_time, ffd_result = _quiet(lambda g, r: first_fit_decreasing(g, r, bits), summaries, rooms)
+        flow_time, flow_result = _quiet(lambda g, r: flow_assign(by_year, r), summaries, rooms)
+        print(f"{num_rooms:>6} {seats_needed:>9} {ffd_time:>8.3f} {_max_fill(ffd_result, rooms):>9.2f} "
+              f"{flow_time:>9.3f} {_max_fill(flow_result, rooms):>10.2f}")
+
+def benchmark_seats(rows, cols, fills, subject_counts, num_branches, seed=0):
+    """Neighbour conflicts of the row-major interleaved layout against the local search"""
+    print(f"{'seats':>6} {'students':>9} {'subjects':>9} {'before':>7} {'after':>6} {'time (s)':>9}")
+    for fill in fills:
+        for num_subjects in subject_counts:
+            rng = random.Random(seed)
+            n = int(fill * rows * cols)
+            subjects = [rng.randrange(num_subjects) for _ in range(n)]
+            branches = [rng.randrange(num_branches) for _ in range(n)]
+            start = time.perf_counter()
+            _, before, after = place_students(subjects, branches, rows, cols, seed)
+            elapsed = time.perf_counter() - start
+            print(f"{rows * cols:>6} {n:>9} {num_subjects:>9} {before:>7} {after:>6} {elapsed:>9.3f}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    subparsers = parser.add_subparsers(dest='benchmark', required=True)
+
+    dsatur_parser = subparsers.add_parser('dsatur', help='heap-based vs rescan DSatur')
+    dsatur_parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    dsatur_parser.add_argument('--degree', type=int, default=4, help='average node degree')
+    dsatur_parser.add_argument('--rescan-limit', type=int, default=10_000,
+                               help='largest graph to run the O(V²) rescan version on')
+    dsatur_parser.add_argument('--seed', type=int, default=0)
+
+    strategies_parser = subparsers.add_parser('strategies', help='speed/quality of every coloring strategy')
+    strategies_parser.add_argument('--sizes', type=int, nargs='+', default=[1_000, 3_000])
+    strategies_parser.add_argument('--degree', type=int, default=16, help='average node degree of the random graphs')
+    strategies_parser.add_argument('--tabu-seconds', type=float, default=2.0)
+    strategies_parser.add_argument('--seed', type=int, default=0)
+
+    slots_parser = subparsers.add_parser('slots', help='clique DSatur when students sit several exam slots')
+    slots_parser.add_argument('--students', type=int, nargs='+', default=[2_000, 5_000, 40_000])
+    slots_parser.add_argument('--slots', type=int, default=40)
+    slots_parser.add_argument('--exams', type=int, default=5, help='exam slots per student')
+    slots_parser.add_argument('--csr-limit', type=int, default=5_000,
+                              help='largest student count also colored on the explicit graph')
+    slots_parser.add_argument('--seed', type=int, default=0)
+
+    memory_parser = subparsers.add_parser('memory', help='per-student footprint of Student records')
+    memory_parser.add_argument('--sizes', type=int, nargs='+', default=[100_000, 1_000_000])
+
+    backtracking_parser = subparsers.add_parser('backtracking', help='bitmask vs set-copying exact room search')
+    backtracking_parser.add_argument('--groups', type=int, default=200)
+    backtracking_parser.add_argument('--rooms', type=int, default=60)
+    # With little slack most random instances are exponential for any exact search;
+    backtracking_parser.add_argument('--seeds', type=int, nargs='+', default=list(range(12)))
+    backtracking_parser.add_argument('--slack', type=int, default=2, help='spare seats per room, at most')
+    backtracking_parser.add_argument('--time-limit', type=float, default=10.0,
+                                     help='seconds each search may run per instance')
+    backtracking_parser.add_argument('--symmetric', action='store_true',
+                                     help='interchangeable rooms and groups instead of a planted packing')
+
+    ffd_parser = subparsers.add_parser('ffd', help='indexed room pool vs re-sorting rooms per group')
+    ffd_parser.add_argument('--groups', type=int, default=2000)
+    ffd_parser.add_argument('--rooms', type=int, nargs='+', default=[100, 300, 1000])
+    ffd_parser.add_argument('--seed', type=int, default=0)
+
+    flow_parser = subparsers.add_parser('flow', help='greedy vs balanced max-flow placement without subject/branch caps')
+    flow_parser.add_argument('--groups', type=int, default=2000)
+    flow_parser.add_argument('--rooms', type=int, nargs='+', default=[100, 300, 1000])
+    flow_parser.add_argument('--spare', type=float, default=0.05, help='spare seats as a fraction of the students')
+    flow_parser.add_argument('--seed', type=int, default=0)
+
+    seats_parser = subparsers.add_parser('seats', help='neighbour conflicts and time of the seat-placement search')
+    seats_parser.add_argument('--rows', type=int, default=20)
+    seats_parser.add_argument('--columns', type=int, default=40)
+    seats_parser.add_argument('--fill', type=float, nargs='+', default=[1.0, 0.75], help='fraction of seats taken')
+    seats_parser.add_argument('--subjects', type=int, nargs='+', default=[3, 8])
+    seats_parser.add_argument('--branches', type=int, default=4)
+    seats_parser.add_argument('--seed', type=int, default=0)
+
+    args = parser.parse_args()
+    if args.benchmark == 'dsatur':
+        benchmark_dsatur(args.sizes, args.degree, args.rescan_limit, args.seed)
+    elif args.benchmark == 'strategies':
+        benchmark_strategies(args.sizes, args.degree, args.tabu_seconds, args.seed)
+    elif args.benchmark == 'slots':
+        benchmark_slots(args.students, args.slots, args.exams, args.csr_limit, args.seed)
+    elif args.benchmark == 'memory':
+        benchmark_memory(args.sizes)
+    elif args.benchmark == 'backtracking':
+        benchmark_backtracking(args.groups, args.rooms, args.seeds, args.slack, args.symmetric, args.time_limit)
+    elif args.benchmark == 'ffd':
+        benchmark_ffd(args.groups, args.rooms, args.seed)
+    elif args.benchmark == 'flow':
+        benchmark_flow(args.groups, args.rooms, args.spare, args.seed)
+    elif args.benchmark == 'seats':
+        benchmark_seats(args.rows, args.columns, args.fill, args.subjects, args.branches, args.seed)
+
+if __name__ == '__main__':
+    main()
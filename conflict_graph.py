@@ -1,8 +1,262 @@
+import heapq
+import os
+import time
+import numpy as np
 import pandas as pd
-import networkx as nx
-from collections import defaultdict
+from collections import defaultdict, Counter
+from collections.abc import Mapping
+from concurrent.futures import ProcessPoolExecutor
+from sparse_graph import CSRGraph
+
+# Columns whose combined value defines an exam slot; students sharing a slot conflict
+CONFLICT_KEY = ('ExamDate', 'ExamTime')
+
+# Graphs smaller than this are colored serially even when workers are requested
+PARALLEL_MIN_NODES = 50_000
+
+# Seconds the tabu-search strategy spends trying to remove colors
+TABU_TIME_LIMIT = 2.0
+
+# RLF (an argmax over all nodes per pick) and tabu search (dense node-by-color
+# tables) grow quadratically; above either size they fall back to DSatur
+QUADRATIC_STRATEGIES = ('rlf', 'tabu')
+QUADRATIC_STRATEGY_MAX_NODES = 20_000
+QUADRATIC_STRATEGY_MAX_EDGES = 2_000_000
+
+# Students in more slots than this have their DSatur degrees counted from bitsets,
+# since the subset count behind the linear computation doubles with every slot
+SUBSET_UNION_MAX_SLOTS = 10
+
+def _dsatur_order(indptr, indices, degrees):
+    """
+    DSatur over CSR arrays with incremental saturation updates.
+    Each node keeps a bitmask of its neighbours' colors; only the neighbours of the
+    node just colored are updated, and the next node comes from a lazy max-heap keyed
+    on (saturation, degree, node id).
+    Returns:
+        (order, colors): node ids in coloring order and the color of every node id
+    """
+    n = len(degrees)
+    indptr = indptr.tolist()
+    degrees = degrees.tolist()
+    masks = [0] * n
+    saturation = [0] * n
+    colors = [-1] * n
+
+    heap = [(0, -degrees[i], i) for i in range(n)]
+    heapq.heapify(heap)
+
+    order = []
+    while heap:
+        neg_sat, _, v = heapq.heappop(heap)
+        if colors[v] >= 0 or -neg_sat != saturation[v]:
+            continue  # Stale entry, a fresher one is queued
+
+        mask = masks[v]
+        color = (~mask & (mask + 1)).bit_length() - 1  # Lowest color no neighbour uses
+        colors[v] = color
+        order.append(v)
+
+        bit = 1 << color
+        for u in indices[indptr[v]:indptr[v + 1]].tolist():
+            if colors[u] < 0 and not masks[u] & bit:
+                masks[u] |= bit
+                saturation[u] += 1
+                heapq.heappush(heap, (-saturation[u], -degrees[u], u))
+
+    return order, colors
 
 def dsatur_coloring(G):
+    """
+    DSatur coloring of a CSRGraph or a networkx.Graph.
+    Ties on saturation break on degree, then on node order, exactly as in the
+    original rescan implementation.
+    Returns:
+        Dictionary of {node: color} in coloring order
+    """
+    graph, degrees = _as_csr(G)
+    order, colors = _dsatur_order(graph.indptr, graph.indices, degrees)
+    return {graph.nodes[v]: colors[v] for v in order}
+
+def _as_csr(G):
+    """CSRGraph plus DSatur degrees for either graph type (self-loops count twice, as in networkx)"""
+    graph = G if isinstance(G, CSRGraph) else CSRGraph.from_networkx(G)
+    return graph, graph.degrees() + 2 * graph.loops
+
+def _component_chunks(labels, workers):
+    """
+    Node ids (ascending) per worker, packing whole connected components largest
+    first onto the lightest chunk; a single component gives a single chunk.
+    """
+    component_ids, component_sizes = np.unique(labels, return_counts=True)
+    chunk_of_component = {}
+    chunk_load = [0] * workers
+    for c in np.argsort(-component_sizes, kind='stable').tolist():
+        lightest = chunk_load.index(min(chunk_load))
+        chunk_of_component[component_ids[c]] = lightest
+        chunk_load[lightest] += int(component_sizes[c])
+    node_chunk = np.array([chunk_of_component[label] for label in labels.tolist()])
+    return [np.flatnonzero(node_chunk == i) for i in range(workers) if chunk_load[i]]
+
+def parallel_dsatur_coloring(G, workers=None, min_parallel_nodes=PARALLEL_MIN_NODES):
+    """
+    Color the connected components of a graph in a process pool.
+    Components never share an edge, and DSatur's choices inside one component do not
+    depend on the others, so coloring them apart gives the same colors as
+    dsatur_coloring; every component reuses colors from 0 and the results merge into
+    the same {color: [student_ids]} groups.
+    Args:
+        G: CSRGraph or networkx.Graph
+        workers: Process count (default: CPU count)
+        min_parallel_nodes: Below this size the graph is colored serially, since
+                            process start-up would cost more than it saves
+    Returns:
+        Dictionary of {node: color}
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1 or len(G.nodes) < min_parallel_nodes:
+        return dsatur_coloring(G)
+
+    graph, degrees = _as_csr(G)
+    chunks = _component_chunks(graph.connected_components(), workers)
+    if len(chunks) == 1:
+        return dsatur_coloring(G)
+
+    colors = {}
+    with ProcessPoolExecutor(max_workers=len(chunks)) as pool:
+        futures = []
+        for node_ids in chunks:
+            sub = graph.subgraph(node_ids)
+            futures.append(pool.submit(_dsatur_order, sub.indptr, sub.indices, degrees[node_ids]))
+        for node_ids, future in zip(chunks, futures):
+            order, chunk_colors = future.result()
+            for v in order:
+                colors[graph.nodes[node_ids[v]]] = chunk_colors[v]
+
+    return colors
+
+def welsh_powell_coloring(G):
+    """Welsh-Powell: greedy first-fit coloring in order of decreasing degree"""
+    graph, degrees = _as_csr(G)
+    indptr = graph.indptr.tolist()
+    colors = [-1] * graph.num_nodes
+    for v in np.argsort(-degrees, kind='stable').tolist():
+        mask = 0
+        for u in graph.indices[indptr[v]:indptr[v + 1]].tolist():
+            if colors[u] >= 0:
+                mask |= 1 << colors[u]
+        colors[v] = (~mask & (mask + 1)).bit_length() - 1
+    return {node: colors[v] for v, node in enumerate(graph.nodes)}
+
+def rlf_coloring(G):
+    """
+    Recursive Largest First: build one color class at a time, starting from the
+    uncolored node with most uncolored neighbours and repeatedly adding the candidate
+    adjacent to the most nodes already excluded from the class. Each pick is a
+    vectorized argmax over all nodes, so the whole run is O(V² + k·E).
+    """
+    graph, _ = _as_csr(G)
+    n = graph.num_nodes
+    indptr, indices = graph.indptr, graph.indices
+    colors = np.full(n, -1, dtype=np.int64)
+    uncolored_degree = graph.degrees().astype(np.int64)
+    scale = int(uncolored_degree.max(initial=0)) + 1
+    color = 0
+
+    while (colors < 0).any():
+        candidate = colors < 0
+        excluded_neighbours = np.zeros(n, dtype=np.int64)
+        while candidate.any():
+            # Most excluded neighbours, then most uncolored neighbours, then lowest id
+            key = np.where(candidate, excluded_neighbours * scale + uncolored_degree, -1)
+            v = int(np.argmax(key))
+            colors[v] = color
+            candidate[v] = False
+
+            neighbours = indices[indptr[v]:indptr[v + 1]]
+            uncolored_degree[neighbours] -= 1
+            newly_excluded = neighbours[candidate[neighbours]]
+            candidate[newly_excluded] = False
+            if len(newly_excluded):
+                spread = np.concatenate([indices[indptr[u]:indptr[u + 1]] for u in newly_excluded.tolist()])
+                np.add.at(excluded_neighbours, spread, 1)
+        color += 1
+
+    return {node: int(colors[v]) for v, node in enumerate(graph.nodes)}
+
+def tabu_coloring(G, time_limit=TABU_TIME_LIMIT, seed=0):
+    """
+    Time-boxed tabu search (TabuCol) improver on top of DSatur.
+    Repeatedly drops the highest color class and searches for a conflict-free
+    recoloring with one color fewer, until time_limit seconds have passed.
+    Returns the best proper coloring found, never worse than DSatur's.
+    """
+    graph, degrees = _as_csr(G)
+    n = graph.num_nodes
+    order, start = _dsatur_order(graph.indptr, graph.indices, degrees)
+    best = np.array(start, dtype=np.int64)
+    if n == 0:
+        return {}
+
+    rng = np.random.default_rng(seed)
+    deadline = time.perf_counter() + time_limit
+    rows = np.repeat(np.arange(n), graph.degrees())
+    cols = graph.indices.astype(np.int64)
+
+    while time.perf_counter() < deadline:
+        k = int(best.max())  # Try to fit everything into colors 0..k-1
+        if k == 0:
+            break
+        colors = best.copy()
+        top = colors == k
+        colors[top] = rng.integers(0, k, size=int(top.sum()))
+
+        # gamma[v, c] = neighbours of v with color c
+        gamma = np.zeros((n, k), dtype=np.int32)
+        np.add.at(gamma, (rows, colors[cols]), 1)
+        tabu_until = np.zeros((n, k), dtype=np.int64)
+        conflicts = int(gamma[np.arange(n), colors].sum()) // 2
+        best_conflicts = conflicts
+        iteration = 0
+
+        while conflicts and time.perf_counter() < deadline:
+            iteration += 1
+            conflicting = np.flatnonzero(gamma[np.arange(n), colors] > 0)
+            delta = gamma[conflicting] - gamma[conflicting, colors[conflicting]][:, None]
+            delta[np.arange(len(conflicting)), colors[conflicting]] = np.iinfo(np.int32).max
+            allowed = (tabu_until[conflicting] <= iteration) | (conflicts + delta < best_conflicts)
+            delta = np.where(allowed, delta, np.iinfo(np.int32).max)
+            flat = int(np.argmin(delta))
+            if delta.flat[flat] == np.iinfo(np.int32).max:
+                continue  # Every move is tabu; let tenures expire
+            i, new_color = divmod(flat, k)
+            v = conflicting[i]
+            old_color = colors[v]
+
+            conflicts += int(delta.flat[flat])
+            neighbours = graph.neighbors(v)
+            np.subtract.at(gamma[:, old_color], neighbours, 1)
+            np.add.at(gamma[:, new_color], neighbours, 1)
+            colors[v] = new_color
+            tabu_until[v, old_color] = iteration + int(0.6 * conflicts) + int(rng.integers(0, 10))
+            best_conflicts = min(best_conflicts, conflicts)
+
+        if conflicts:
+            break
+        best = colors
+
+    return {graph.nodes[v]: int(best[v]) for v in order}
+
+# Coloring strategies selectable by name; each takes a CSRGraph or networkx.Graph
+COLORING_STRATEGIES = {
+    'dsatur': dsatur_coloring,
+    'welsh_powell': welsh_powell_coloring,
+    'rlf': rlf_coloring,
+    'tabu': tabu_coloring
+}
+
+def dsatur_coloring_rescan(G):
+    """Original DSatur that rescans every uncolored node per step; kept for benchmarking"""
     if len(G.nodes) == 0:
         return {}
         
@@ -36,7 +290,259 @@ def dsatur_coloring(G):
 
     return colors
 
-def get_colored_groups(df):
+def build_slot_cliques(df, key=CONFLICT_KEY):
+    """
+    Group enrollment rows by exam slot without enumerating conflict pairs.
+    Every slot is an implicit clique: all of its students conflict with each other.
+    Returns:
+        (nodes, cliques) where nodes lists StudentIDs in first-appearance order and
+        cliques lists the node indices of each slot. Rows with a missing slot value
+        conflict with nobody, like the pairwise comparison they replace.
+    """
+    node_codes, nodes = pd.factorize(df['StudentID'])
+    slot_codes = df.groupby(list(key), sort=False).ngroup()
+    pairs = pd.DataFrame({'slot': slot_codes.to_numpy(), 'node': node_codes})
+    pairs = pairs.dropna().astype(int)
+
+    cliques = [members.to_numpy() for _, members in pairs.groupby('slot', sort=False)['node']]
+    return list(nodes), cliques
+
+def is_disjoint_cliques(nodes, cliques):
+    """True when no student appears in more than one slot (or twice in one slot)"""
+    if not cliques:
+        return True
+    memberships = np.bincount(np.concatenate(cliques), minlength=len(nodes))
+    return bool(memberships.max(initial=0) <= 1)
+
+def slot_index_coloring(nodes, cliques):
+    """
+    Optimal coloring of a disjoint union of cliques in O(n): each student's color is
+    their position within their slot. Nodes are emitted in the order DSatur would
+    color them (largest slot first, ties by first student), so the groups are the
+    same as clique_dsatur_coloring's.
+    """
+    in_clique = np.zeros(len(nodes), dtype=bool)
+    for members in cliques:
+        in_clique[members] = True
+    # Students outside every slot behave like one-node cliques
+    slots = [np.sort(members).tolist() for members in cliques]
+    slots.extend([v] for v in np.flatnonzero(~in_clique).tolist())
+    slots.sort(key=lambda members: (-len(members), members[0]))
+
+    colors = {}
+    for members in slots:
+        for color, v in enumerate(members):
+            colors[nodes[v]] = color
+    return colors
+
+def _union_sizes(membership, k):
+    """
+    Size of the union of each student's slots, by inclusion-exclusion over the
+    subsets of their slots: the students in every slot of a subset are those whose
+    slots contain it, so one grouping of all students' slot subsets counts them all.
+    Costs O(sum 2^d) for students with d slots, so it is linear in the students
+    while each sits a bounded number of exams (see SUBSET_UNION_MAX_SLOTS).
+    Args:
+        membership: Slots of each student, ascending, padded with k
+        k: Number of slots
+    Returns:
+        Array with the number of students sharing at least one slot with each student
+        (the student included; 0 for students in no slot)
+    """
+    n, width = membership.shape
+    slot_counts = (membership < k).sum(axis=1)
+    owners, subsets, signs = [], [], []
+    for mask in range(1, 1 << width):
+        cols = [j for j in range(width) if mask >> j & 1]
+        rows = np.flatnonzero(slot_counts > cols[-1])
+        subset = np.full((len(rows), width), k, dtype=np.int64)
+        subset[:, :len(cols)] = membership[np.ix_(rows, cols)]
+        owners.append(rows)
+        subsets.append(subset)
+        signs.append(1 if len(cols) % 2 else -1)
+    if not owners:
+        return np.zeros(n, dtype=np.int64)
+
+    subsets = np.concatenate(subsets)
+    radix = k + 1
+    if radix ** width < 2 ** 62:
+        # One int64 per subset, so grouping is a 1-D sort
+        keys = np.zeros(len(subsets), dtype=np.int64)
+        for j in range(width):
+            keys = keys * radix + subsets[:, j]
+        _, inverse, counts = np.unique(keys, return_inverse=True, return_counts=True)
+    else:
+        _, inverse, counts = np.unique(subsets, axis=0, return_inverse=True, return_counts=True)
+    weights = counts[inverse.reshape(-1)] * np.repeat(signs, [len(rows) for rows in owners])
+    return np.bincount(np.concatenate(owners), weights=weights, minlength=n).astype(np.int64)
+
+def _union_sizes_bitset(membership, k, members):
+    """
+    Size of the union of each student's slots from bit-packed slot member rows, for
+    students in too many slots to enumerate their subsets. Students with the same
+    slots share one union, so it is computed once per distinct set of slots.
+    """
+    n = len(membership)
+    incidence = np.zeros((k + 1, (n + 7) // 8), dtype=np.uint8)
+    for c, m in enumerate(members):
+        row = np.zeros(n, dtype=bool)
+        row[m] = True
+        incidence[c] = np.packbits(row)
+    slot_sets, inverse = np.unique(membership, axis=0, return_inverse=True)
+    sizes = np.array([
+        int(np.unpackbits(np.bitwise_or.reduce(incidence[row], axis=0)).sum()) for row in slot_sets
+    ], dtype=np.int64)
+    return sizes[inverse.reshape(-1)]
+
+def clique_dsatur_coloring(nodes, cliques):
+    """
+    DSatur over a graph given as a union of cliques, without expanding its edges.
+    Colors nodes in exactly the order dsatur_coloring would on the expanded graph.
+    A color is new to a student exactly when none of their slots uses it yet, so
+    each step only visits the uncolored slot-mates of the colored student, checks
+    them against per-color slot bits and bumps the saturation of those gaining a
+    color. The next student comes from per-block maxima of (saturation, degree),
+    which only change for those slot-mates. Work is proportional to the explicit
+    graph's edges, each visited once, but no edge is ever stored.
+    """
+    n = len(nodes)
+    looped = np.zeros(n, dtype=bool)
+    members = []
+    for clique in cliques:
+        unique, counts = np.unique(np.asarray(clique, dtype=np.int64), return_counts=True)
+        # A student listed twice in one slot is a self-loop in the explicit graph
+        looped[unique[counts > 1]] = True
+        members.append(unique)
+    k = len(members)
+
+    # membership[v] lists v's slots ascending, padded with slot k, which holds nobody and no color
+    node_of = np.concatenate(members + [np.empty(0, dtype=np.int64)])
+    slot_of = np.repeat(np.arange(k), [len(m) for m in members])
+    slot_counts = np.bincount(node_of, minlength=n)
+    width = max(int(slot_counts.max(initial=0)), 1)
+    order = np.argsort(node_of, kind='stable')
+    column = np.arange(len(order)) - np.repeat(np.cumsum(slot_counts) - slot_counts, slot_counts)
+    membership = np.full((n, width), k, dtype=np.int64)
+    membership[node_of[order], column] = slot_of[order]
+
+    if width <= SUBSET_UNION_MAX_SLOTS:
+        unions = _union_sizes(membership, k)
+    else:
+        unions = _union_sizes_bitset(membership, k, members)
+    # networkx counts a self-loop twice, so a looped student gains 2 beyond the union
+    degrees = np.maximum(unions - 1, 0) + 2 * looped
+
+    # Slots as bits, 64 per word: slot_bits[v] holds v's slots and color_bits[color] the
+    # slots some student of that color sits. A color is free for v, or already known
+    # to a mate, with one AND per word. Never more colors than max degree + 1
+    words = max(-(-k // 64), 1)
+    slot_bits = np.zeros((n, words), dtype=np.uint64)
+    np.bitwise_or.at(slot_bits, (node_of, slot_of // 64), np.left_shift(np.uint64(1), (slot_of % 64).astype(np.uint64)))
+    if words == 1:
+        slot_bits = slot_bits[:, 0]
+    color_bits = np.zeros((int(degrees.max(initial=0)) + 2,) + slot_bits.shape[1:], dtype=np.uint64)
+    # Uncolored members of each slot and their slot bits; compacted once half are colored
+    live = list(members)
+    live_bits = [slot_bits[m] for m in members]
+    dead = [0] * k
+
+    # key orders by (saturation, degree); -1 once colored. block_max[b] is the largest
+    # key in block b, so the first highest key (lowest node id on ties, as in
+    # _dsatur_order) is found without scanning every node
+    scale = int(degrees.max(initial=0)) + 1
+    key = degrees.copy()
+    block = max(int(np.sqrt(n)), 1)
+    padded = np.full(-(-n // block) * block, -1, dtype=np.int64)
+    padded[:n] = key
+    block_max = padded.reshape(-1, block).max(axis=1) if n else padded
+    num_colors = 0
+
+    colors = {}
+    for _ in range(n):
+        b = int(np.argmax(block_max))
+        start = b * block
+        v = start + int(np.argmax(key[start:start + block]))
+        shared = color_bits[:num_colors + 1] & slot_bits[v]
+        color = int(np.argmax(shared == 0 if words == 1 else ~shared.any(axis=1)))
+        num_colors = max(num_colors, color + 1)
+        colors[nodes[v]] = color
+        key[v] = -1
+        block_max[b] = key[start:start + block].max()
+
+        known = color_bits[color]
+        gained = []
+        for c in membership[v, :slot_counts[v]].tolist():
+            if dead[c] * 2 > len(live[c]):
+                alive = key[live[c]] >= 0
+                live[c], live_bits[c], dead[c] = live[c][alive], live_bits[c][alive], 0
+            dead[c] += 1
+            # Uncolored mates without the color in any of their slots gain it
+            shared = live_bits[c] & known
+            new = live[c][shared == 0 if words == 1 else ~shared.any(axis=1)]
+            gained.append(new[key[new] >= 0])
+        color_bits[color] |= slot_bits[v]
+        if gained:
+            gained = np.concatenate(gained)
+            key[gained] += scale  # a mate in several of v's slots still counts once
+            np.maximum.at(block_max, gained // block, key[gained])
+
+    return colors
+
+def parallel_clique_dsatur_coloring(nodes, cliques, workers=None, min_parallel_nodes=PARALLEL_MIN_NODES):
+    """
+    clique_dsatur_coloring with the connected components colored in a process pool,
+    as parallel_dsatur_coloring does for explicit graphs. Slots sharing a student are
+    linked by a star of edges per slot, so components are found without expanding
+    the cliques; every slot lies inside one component and goes to its worker.
+    Args:
+        nodes: Node labels (StudentIDs), as from build_slot_cliques
+        cliques: Node indices of each slot
+        workers: Process count (default: CPU count)
+        min_parallel_nodes: Below this size the graph is colored serially
+    Returns:
+        Dictionary of {node: color}
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1 or len(nodes) < min_parallel_nodes:
+        return clique_dsatur_coloring(nodes, cliques)
+
+    cliques = [np.asarray(clique, dtype=np.int64) for clique in cliques]
+    links = [clique for clique in cliques if len(clique) > 1]
+    src = np.concatenate([clique[1:] for clique in links] + [np.empty(0, dtype=np.int64)])
+    dst = np.concatenate([np.repeat(clique[0], len(clique) - 1) for clique in links] + [np.empty(0, dtype=np.int64)])
+    chunks = _component_chunks(CSRGraph.from_edges(range(len(nodes)), src, dst).connected_components(), workers)
+    if len(chunks) == 1:
+        return clique_dsatur_coloring(nodes, cliques)
+
+    chunk_of = np.empty(len(nodes), dtype=np.int64)
+    remap = np.empty(len(nodes), dtype=np.int64)
+    for i, node_ids in enumerate(chunks):
+        chunk_of[node_ids] = i
+        remap[node_ids] = np.arange(len(node_ids))  # ascending, so ties still go to the lowest id
+    chunk_cliques = [[] for _ in chunks]
+    for clique in cliques:
+        if len(clique):
+            chunk_cliques[chunk_of[clique[0]]].append(remap[clique])
+
+    colors = {}
+    with ProcessPoolExecutor(max_workers=len(chunks)) as pool:
+        futures = [
+            pool.submit(clique_dsatur_coloring, [nodes[v] for v in node_ids.tolist()], sub_cliques)
+            for node_ids, sub_cliques in zip(chunks, chunk_cliques)
+        ]
+        for future in futures:
+            colors.update(future.result())
+    return colors
+
+def build_conflict_csr(df, key=CONFLICT_KEY):
+    """Build the explicit conflict graph as a CSRGraph with one clique per exam slot"""
+    nodes, cliques = build_slot_cliques(df, key)
+    return CSRGraph.from_cliques(nodes, cliques)
+
+def build_pairwise_graph(df):
+    """Build the explicit conflict graph by comparing every pair of rows (requires networkx)"""
+    import networkx as nx
+
     G = nx.Graph()
 
     for student_id in df['StudentID']:
@@ -51,29 +557,302 @@ def get_colored_groups(df):
                 G.add_edge(s1['StudentID'], s2['StudentID'])
                 conflicts_added += 1
 
-    color_mapping = dsatur_coloring(G)
+    return G
+
+def _strategy_fits(strategy, num_nodes, num_edges):
+    """Whether strategy can color a graph this size; warns when it has to fall back to DSatur"""
+    if strategy not in QUADRATIC_STRATEGIES:
+        return True
+    if num_nodes <= QUADRATIC_STRATEGY_MAX_NODES and num_edges <= QUADRATIC_STRATEGY_MAX_EDGES:
+        return True
+    print(f"⚠️ The {strategy} strategy is limited to {QUADRATIC_STRATEGY_MAX_NODES:,} students and "
+          f"{QUADRATIC_STRATEGY_MAX_EDGES:,} conflicts; this input has {num_nodes:,} students and "
+          f"up to {num_edges:,} conflicts, so DSatur is used instead.")
+    return False
+
+def get_colored_groups(df, mode='slots', workers=1, report=None, strategy='dsatur'):
+    """
+    Color the conflict graph and group students by color.
+    Args:
+        df: Student DataFrame with StudentID, ExamDate and ExamTime columns
+        mode: 'slots' builds one implicit clique per exam slot, never the edges
+              (linear when every student sits one slot),
+              'csr' builds the explicit graph as compact CSR arrays,
+              'pairwise' builds the explicit networkx graph row by row (O(n²))
+        workers: Processes used to color connected components in parallel with
+                 DSatur (None for the CPU count); 1 colors serially
+        report: Optional dict that receives the coloring path taken ('path')
+        strategy: Name of the coloring strategy in COLORING_STRATEGIES, used
+                  whenever the graph is not a disjoint union of slot cliques;
+                  rlf and tabu fall back to DSatur above the QUADRATIC_STRATEGY_* sizes
+    Returns:
+        Dictionary of {color: [student_ids]}
+    """
+    if strategy not in COLORING_STRATEGIES:
+        raise ValueError(f"Unknown coloring strategy: {strategy}")
+
+    if mode == 'slots':
+        nodes, cliques = build_slot_cliques(df)
+        if strategy in QUADRATIC_STRATEGIES:
+            # Upper bound on the explicit edges, without building them
+            sizes = np.array([len(clique) for clique in cliques], dtype=np.int64)
+            if not _strategy_fits(strategy, len(nodes), int((sizes * (sizes - 1) // 2).sum())):
+                strategy = 'dsatur'
+        if is_disjoint_cliques(nodes, cliques):
+            # One slot per student: the optimal coloring is known, no search needed
+            path = 'slot-index'
+            color_mapping = slot_index_coloring(nodes, cliques)
+        elif strategy == 'dsatur':
+            path = 'clique-dsatur'
+            color_mapping = parallel_clique_dsatur_coloring(nodes, cliques, workers)
+        else:
+            path = f'csr-{strategy}'
+            color_mapping = COLORING_STRATEGIES[strategy](CSRGraph.from_cliques(nodes, cliques))
+    elif mode in ('csr', 'pairwise'):
+        graph = build_conflict_csr(df) if mode == 'csr' else build_pairwise_graph(df)
+        if isinstance(graph, CSRGraph):
+            size = (graph.num_nodes, graph.num_edges)
+        else:
+            size = (graph.number_of_nodes(), graph.number_of_edges())
+        if not _strategy_fits(strategy, *size):
+            strategy = 'dsatur'
+        path = f'{mode}-{strategy}'
+        if strategy == 'dsatur':
+            color_mapping = parallel_dsatur_coloring(graph, workers)
+        else:
+            color_mapping = COLORING_STRATEGIES[strategy](graph)
+    else:
+        raise ValueError(f"Unknown conflict graph mode: {mode}")
+
+    if report is not None:
+        report['path'] = path
+
     groups = defaultdict(list)
     for student, color in color_mapping.items():
         groups[color].append(student)
     
     return groups
 
+class SlotColoring:
+    """
+    Slot-key coloring that can be updated in place when students.csv changes.
+    Keeps every student's enrollments and color plus the colors in use per slot, so a
+    late registration, withdrawal or slot change only recolors the students it touches.
+    A student keeps their color whenever it is still free in all of their slots;
+    otherwise they take the lowest color free in all of them.
+    """
+
+    def __init__(self, key=CONFLICT_KEY):
+        self.key = tuple(key)
+        self.colors = {}
+        self.slots = {}
+        self.slot_colors = defaultdict(Counter)
+        self.slot_free = defaultdict(int)
+        self.members = defaultdict(dict)
+
+    @classmethod
+    def from_dataframe(cls, df, groups=None, key=CONFLICT_KEY):
+        """
+        Index a student DataFrame and its previous coloring.
+        Args:
+            df: Student DataFrame the coloring was computed from
+            groups: Previous {color: [student_ids]}; computed when not given
+        """
+        coloring = cls(key)
+        if groups is None:
+            groups = get_colored_groups(df)
+        for color, student_ids in groups.items():
+            for student_id in student_ids:
+                coloring.colors[student_id] = color
+                coloring.members[color][student_id] = None
+
+        for student_id, *values in zip(df['StudentID'].tolist(), *(df[k].tolist() for k in key)):
+            slot = coloring._slot(values)
+            coloring.slots.setdefault(student_id, []).append(slot)
+            if slot is not None and student_id in coloring.colors:
+                coloring._take(slot, coloring.colors[student_id])
+
+        # Students missing from the previous coloring are colored like new arrivals
+        for student_id in [sid for sid in coloring.slots if sid not in coloring.colors]:
+            coloring._set_slots(student_id, coloring.slots[student_id])
+        return coloring
+
+    def _slot(self, values):
+        # Rows with a missing slot value conflict with nobody
+        if any(pd.isna(value) for value in values):
+            return None
+        return tuple(values)
+
+    def _take(self, slot, color):
+        counts = self.slot_colors[slot]
+        counts[color] += 1
+        # slot_free[slot] is a lower bound on the slot's lowest free color
+        while counts[self.slot_free[slot]]:
+            self.slot_free[slot] += 1
+
+    def _release(self, slot, color):
+        counts = self.slot_colors[slot]
+        counts[color] -= 1
+        if not counts[color]:
+            del counts[color]
+            self.slot_free[slot] = min(self.slot_free[slot], color)
+
+    def _set_slots(self, student_id, slots):
+        old_color = self.colors.get(student_id)
+        for slot in self.slots.get(student_id, []):
+            if slot is not None and old_color is not None:
+                self._release(slot, old_color)
+        self.slots[student_id] = slots
+
+        busy = [slot for slot in slots if slot is not None]
+        color = old_color
+        if color is None or any(self.slot_colors[slot][color] for slot in busy):
+            color = max((self.slot_free[slot] for slot in busy), default=0)
+            while any(self.slot_colors[slot][color] for slot in busy):
+                color += 1
+
+        for slot in busy:
+            self._take(slot, color)
+        if color != old_color:
+            if old_color is not None:
+                del self.members[old_color][student_id]
+            self.members[color][student_id] = None
+            self.colors[student_id] = color
+        return old_color, color
+
+    def _drop(self, student_id):
+        old_color = self.colors.pop(student_id, None)
+        for slot in self.slots.pop(student_id, []):
+            if slot is not None and old_color is not None:
+                self._release(slot, old_color)
+        if old_color is not None:
+            del self.members[old_color][student_id]
+        return old_color, None
+
+    def apply(self, deltas):
+        """
+        Apply row deltas and recolor only the students they touch.
+        Each delta is a dict with 'op' and 'StudentID' plus the slot columns:
+            'add':    a new enrollment row (registers the student if new); an
+                      enrollment the student already has is ignored
+            'remove': drops that enrollment row, or the whole student when the slot
+                      columns are omitted or it was their last row
+            'update': moves one enrollment to the given slot; 'old' names the row
+                      it changes ({slot column: value}) and may only be left out
+                      when the student has a single enrollment
+        An update naming a slot the student does not sit raises ValueError.
+        Returns:
+            {student_id: (old_color, new_color)} for students whose color changed;
+            None stands for "not colored"
+        """
+        changes = {}
+        for delta in deltas:
+            op = delta['op']
+            student_id = delta['StudentID']
+            slot = self._slot([delta.get(k) for k in self.key])
+            current = list(self.slots.get(student_id, []))
+
+            if op == 'add':
+                if current and slot in current:
+                    continue
+                result = self._set_slots(student_id, current + [slot])
+            elif op == 'update':
+                if 'old' in delta:
+                    old = self._slot([delta['old'].get(k) for k in self.key])
+                elif len(current) == 1:
+                    old = current[0]
+                else:
+                    raise ValueError(f"Update of {student_id} must name the enrollment it changes ('old'), "
+                                     f"they sit {len(current)} slots")
+                if old not in current:
+                    raise ValueError(f"{student_id} has no enrollment in slot {old}")
+                current[current.index(old)] = slot
+                result = self._set_slots(student_id, current)
+            elif op == 'remove':
+                if all(k in delta for k in self.key) and slot in current:
+                    current.remove(slot)
+                else:
+                    current = []
+                result = self._set_slots(student_id, current) if current else self._drop(student_id)
+            else:
+                raise ValueError(f"Unknown delta op: {op}")
+
+            if result[0] != result[1]:
+                first = changes.get(student_id, result)[0]
+                changes[student_id] = (first, result[1])
+
+        return {sid: change for sid, change in changes.items() if change[0] != change[1]}
+
+    def groups(self):
+        """Current {color: [student_ids]} for non-empty colors"""
+        return {color: list(members) for color, members in sorted(self.members.items()) if members}
+
+class StudentStore(Mapping):
+    """
+    Columnar student metadata: one array of category codes per field and a
+    StudentID -> row index. Behaves like the {student_id: {field: value}} dict that
+    extract_student_metadata used to return; a row is materialized only when looked up.
+    """
+
+    def __init__(self, index, columns):
+        self.index = index
+        self.columns = columns
+
+    def row(self, i):
+        return {field: values[codes[i]] for field, (codes, values) in self.columns.items()}
+
+    def __getitem__(self, student_id):
+        return self.row(self.index[student_id])
+
+    def __contains__(self, student_id):
+        return student_id in self.index
+
+    def __iter__(self):
+        return iter(self.index)
+
+    def __len__(self):
+        return len(self.index)
+
+    def distinct(self, field):
+        """Set of values a field takes across all students, without building rows"""
+        codes, values = self.columns[field]
+        rows = np.fromiter(self.index.values(), dtype=np.int64, count=len(self.index))
+        return {values[code] for code in np.unique(codes[rows]).tolist()}
+
+    def to_dict(self):
+        """Plain nested dict, e.g. for storing in the Flask session"""
+        return {student_id: self.row(i) for student_id, i in self.index.items()}
+
+def _column(df, name, default):
+    return df[name] if name in df.columns else pd.Series(default, index=df.index)
+
 def extract_student_metadata(df):
-    metadata = {}
-    for _, row in df.iterrows():
-        student_data = {
-            'Name': row.get('Name', f"Student-{row['StudentID']}"),
-            'Department': row['Department'],
-            'Subject': row['Subject'],
-            'ExamTime': row['ExamTime'],
-            'ExamDate': row['ExamDate'],
-            'Year': str(row['Year']),
-            'Branch': row.get('Batch', 'Unknown'),
-            'Semester': row.get('Semester', 'Unknown'),
-            'Batch': row.get('Batch', 'Unknown'),
-            'Photo': row.get('Photo', ''),
-            'Location': row.get('Location', '')
-        }
-        metadata[row['StudentID']] = student_data
-    
-    return metadata
\ No newline at end of file
+    """
+    Build the per-student metadata column by column.
+    Returns:
+        StudentStore mapping {student_id: {field: value}}; when a StudentID repeats,
+        its last row wins as before
+    """
+    student_ids = df['StudentID'].tolist()
+    batch = _column(df, 'Batch', 'Unknown')
+    fields = {
+        'Name': _column(df, 'Name', [f"Student-{sid}" for sid in student_ids]),
+        'Department': df['Department'],
+        'Subject': df['Subject'],
+        'ExamTime': df['ExamTime'],
+        'ExamDate': df['ExamDate'],
+        'Year': df['Year'].map(str),
+        'Branch': batch,
+        'Semester': _column(df, 'Semester', 'Unknown'),
+        'Batch': batch,
+        'Photo': _column(df, 'Photo', ''),
+        'Location': _column(df, 'Location', '')
+    }
+
+    columns = {}
+    for field, series in fields.items():
+        codes, values = pd.factorize(series, use_na_sentinel=False)
+        columns[field] = (codes.astype(np.int32), values.tolist())
+
+    index = dict(zip(student_ids, range(len(student_ids))))
+    return StudentStore(index, columns)
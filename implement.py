@@ -1,7 +1,7 @@
 import pandas as pd
-import networkx as nx
 from collections import defaultdict
 from conflict_graph import dsatur_coloring
+from sparse_graph import CSRGraph
 
 # Load data with error handling
 try:
@@ -14,23 +14,23 @@ required_columns = ['StudentID', 'Subject', 'ExamTime']
 if not all(col in df.columns for col in required_columns):
     raise SystemExit("❌ Error: CSV file is missing required columns")
 
-# Create conflict graph
-G = nx.Graph()
+# Number students so the conflict graph can use integer node ids
+node_codes, nodes = pd.factorize(df['StudentID'])
+df['Node'] = node_codes
 
-# Efficiently add edges using pandas merge
+# Efficiently find conflicts using pandas merge
 # Create self-merge on Subject and ExamTime
 conflicts = pd.merge(df, df, on=['Subject', 'ExamTime'])
 # Filter out same-student pairs and duplicate pairs
 conflicts = conflicts[conflicts['StudentID_x'] < conflicts['StudentID_y']]
 
-# Add edges from conflicts
-for _, row in conflicts.iterrows():
-    G.add_edge(row['StudentID_x'], row['StudentID_y'])
+# Create conflict graph as compact CSR adjacency arrays
+G = CSRGraph.from_edges(list(nodes), conflicts['Node_x'].to_numpy(), conflicts['Node_y'].to_numpy())
 
 # Apply DSatur algorithm
 try:
     color_mapping = dsatur_coloring(G)
-except nx.NetworkXException as e:
+except ValueError as e:
     raise SystemExit(f"❌ Graph coloring failed: {e}")
 
 # Group students by color with sorting
@@ -1,10 +1,11 @@
 import pandas as pd
 import os
 import sqlite3
-from conflict_graph import get_colored_groups, extract_student_metadata
-from room_assignment import assign_rooms_to_groups
-from seat_layout import assign_seats_in_room
-from visualization import create_simple_html_visualization
+import time
+from conflict_graph import get_colored_groups, extract_student_metadata, COLORING_STRATEGIES
+from room_assignment import FIT_POLICIES, PORTFOLIO_SEEDS, SEARCH_TIME_LIMIT
+from sessions import SESSION_KEY, split_sessions, session_tasks, solve_sessions, session_room_key, room_tasks, solve_rooms
+from stage_cache import StageCache, fingerprint, file_fingerprints, files_unchanged
 
 def get_or_create_shared_totp_secret():
     """Get or create a shared TOTP secret for admin and teachers"""
@@ -50,7 +51,7 @@ def get_rooms_config_from_db(db_path='data/system.db'):
         cursor = conn.cursor()
         cursor.execute('''
             SELECT room_name, capacity, max_subjects, max_branches, allowed_years, 
-                   allowed_branches, layout_columns, layout_rows 
+                   allowed_branches, layout_columns, layout_rows, seat_map 
             FROM room_configs ORDER BY room_name
         ''')
         rooms_data = cursor.fetchall()
@@ -66,7 +67,8 @@ def get_rooms_config_from_db(db_path='data/system.db'):
                 'allowed_years': [int(y) for y in row[4].split(',') if y.strip()] if row[4] else [],
                 'allowed_branches': row[5].split(',') if row[5] else [],
                 'layout_columns': row[6] or 6,
-                'layout_rows': row[7] or 5
+                'layout_rows': row[7] or 5,
+                'seat_map': row[8]
             }
             rooms_config.append(room_config)
         
@@ -118,9 +120,13 @@ def init_database_if_needed():
                 allowed_years TEXT,
                 allowed_branches TEXT,
                 layout_columns INTEGER DEFAULT 6,
-                layout_rows INTEGER DEFAULT 5
+                layout_rows INTEGER DEFAULT 5,
+                seat_map TEXT
             )
         ''')
+        # Tables created before seat maps existed; NULL means a full rectangle
+        if 'seat_map' not in [column[1] for column in cursor.execute('PRAGMA table_info(room_configs)')]:
+            cursor.execute('ALTER TABLE room_configs ADD COLUMN seat_map TEXT')
         
         # Check if table is empty and populate with defaults
         cursor.execute('SELECT COUNT(*) FROM room_configs')
@@ -157,22 +163,50 @@ def init_database_if_needed():
         print(f"⚠️ Error initializing database: {e}")
         print("Using fallback room configuration...")
 
-# For backward compatibility, set ROOMS_CONFIG to load from database
+# Importing this module touches neither the database nor the TOTP secret; both
+# happen on first use, once per process
+_database_ready = False
+_rooms_config = None
+
+def ensure_database():
+    """Create and seed the database the first time this process needs it"""
+    global _database_ready
+    if not _database_ready:
+        init_database_if_needed()
+        _database_ready = True
+
 def load_rooms_config():
     """Load room configurations with database initialization"""
-    init_database_if_needed()
+    ensure_database()
     return get_rooms_config_from_db()
 
-ROOMS_CONFIG = load_rooms_config()
+def get_rooms_config():
+    """Room configurations, loaded on first call and kept until reload_rooms_config"""
+    global _rooms_config
+    if _rooms_config is None:
+        _rooms_config = load_rooms_config()
+    return _rooms_config
+
+def __getattr__(name):
+    # For backward compatibility, main.ROOMS_CONFIG still works, loaded on first access
+    if name == 'ROOMS_CONFIG':
+        return get_rooms_config()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-def create_index_page(room_names, final_layout, metadata, output_path="visualizations/index.html"):
-    """Create a searchable dashboard of all students"""
+def create_index_page(room_names, final_layout, metadata, output_path="visualizations/index.html", room_metadata=None):
+    """
+    Create a searchable dashboard of all students.
+    room_metadata ({room: metadata}) overrides metadata for the rooms it lists, so a
+    student sitting several sessions shows each session's own subject.
+    """
+    room_metadata = room_metadata or {}
     # Create a searchable database of all students
     student_database = []
     for room, seats in final_layout.items():
+        room_info = room_metadata.get(room, metadata)
         for seat in seats:
             student_id = seat['student_id']
-            info = metadata.get(student_id, {})
+            info = room_info.get(student_id, {})
             student_database.append({
                 'id': student_id,
                 'name': info.get('Name', 'Unknown'),
@@ -448,7 +482,8 @@ def create_index_page(room_names, final_layout, metadata, output_path="visualiza
 </html>
 """)
 
-def main():
+def main(coloring_strategy='dsatur', use_cache=True, fit_policy='worst_fit', workers=None,
+         time_limit=SEARCH_TIME_LIMIT, node_limit=None):
     INPUT_FILE = 'data/students.csv'
 
     print("📚 Starting Exam Seating Arrangement System...\n")
@@ -488,184 +523,247 @@ def main():
         print("You can now edit this file with your actual student data and run the script again.")
         return
 
+    cache = StageCache(enabled=use_cache)
+    algorithm_options = {'coloring_strategy': coloring_strategy}
+
     # Step 1: Load CSV data first
     print("🔍 Loading student data...")
-    try:
-        # Load the CSV file into a DataFrame
-        df_students = pd.read_csv(INPUT_FILE)
-        print(f"✅ Loaded {len(df_students)} student records from {INPUT_FILE}")
-        
-        # Validate and map columns
-        print("🔍 Validating CSV structure...")
-        required_columns = ['StudentID', 'Name', 'Department', 'Year', 'Subject', 'ExamDate', 'ExamTime']
-        
-        # Check for required columns
-        missing_columns = [col for col in required_columns if col not in df_students.columns]
+    with open(INPUT_FILE, 'rb') as f:
+        students_hash = fingerprint(f.read())
+    conflicts_key = fingerprint('conflicts', students_hash, algorithm_options, SESSION_KEY)
+    hit, cached = cache.load('conflicts', conflicts_key)
+    if hit:
+        metadata, groups, coloring_report, sessions = cached
+        print(f"♻️ {INPUT_FILE} unchanged, reusing cached metadata, conflict groups and sessions")
+    else:
+        try:
+            # Load the CSV file into a DataFrame
+            df_students = pd.read_csv(INPUT_FILE)
+            print(f"✅ Loaded {len(df_students)} student records from {INPUT_FILE}")
+        
+            # Validate and map columns
+            print("🔍 Validating CSV structure...")
+            required_columns = ['StudentID', 'Name', 'Department', 'Year', 'Subject', 'ExamDate', 'ExamTime']
+        
+            # Check for required columns
+            missing_columns = [col for col in required_columns if col not in df_students.columns]
+        
+            if missing_columns:
+                print(f"❌ Error: Missing required columns: {missing_columns}")
+                print(f"Required columns: {required_columns}")
+                print(f"Found columns: {list(df_students.columns)}")
+                return
+        
+            # Handle column mapping - your CSV uses 'Batch' instead of 'Branch'
+            if 'Branch' not in df_students.columns and 'Batch' in df_students.columns:
+                print("📝 Mapping 'Batch' column to 'Branch' for compatibility...")
+                df_students['Branch'] = df_students['Batch']
+        
+            # Add missing optional columns with default values if they don't exist
+            optional_columns = {
+                'PhotoPath': '/static/uploads/default.jpg',
+                'Gender': 'U',  # Unknown
+                'Semester': df_students.get('Semester', df_students.get('Year', 1) * 2)  # Estimate semester from year
+            }
         
-        if missing_columns:
-            print(f"❌ Error: Missing required columns: {missing_columns}")
-            print(f"Required columns: {required_columns}")
-            print(f"Found columns: {list(df_students.columns)}")
+            for col, default_value in optional_columns.items():
+                if col not in df_students.columns:
+                    df_students[col] = default_value
+        
+            print(f"✅ CSV validation complete. Processed {len(df_students)} students")
+        
+            # Extract metadata and get conflict groups
+            print("🔍 Detecting conflicts and extracting metadata...")
+        
+            # Try with DataFrame first, if that fails, try with file path
+            coloring_report = {}
+            try:
+                metadata = extract_student_metadata(df_students)
+                groups = get_colored_groups(df_students, workers=workers, report=coloring_report, strategy=coloring_strategy)
+                sessions = split_sessions(df_students)
+            except (AttributeError, TypeError) as e:
+                print("🔄 Trying with file path instead of DataFrame...")
+                metadata = extract_student_metadata(INPUT_FILE)
+                groups = get_colored_groups(INPUT_FILE, workers=workers, report=coloring_report, strategy=coloring_strategy)
+                sessions = split_sessions(INPUT_FILE)
+        
+        except FileNotFoundError:
+            print(f"❌ Error: File {INPUT_FILE} not found!")
             return
-        
-        # Handle column mapping - your CSV uses 'Batch' instead of 'Branch'
-        if 'Branch' not in df_students.columns and 'Batch' in df_students.columns:
-            print("📝 Mapping 'Batch' column to 'Branch' for compatibility...")
-            df_students['Branch'] = df_students['Batch']
-        
-        # Add missing optional columns with default values if they don't exist
-        optional_columns = {
-            'PhotoPath': '/static/uploads/default.jpg',
-            'Gender': 'U',  # Unknown
-            'Semester': df_students.get('Semester', df_students.get('Year', 1) * 2)  # Estimate semester from year
-        }
-        
-        for col, default_value in optional_columns.items():
-            if col not in df_students.columns:
-                df_students[col] = default_value
-        
-        print(f"✅ CSV validation complete. Processed {len(df_students)} students")
-        
-        # Extract metadata and get conflict groups
-        print("🔍 Detecting conflicts and extracting metadata...")
-        
-        # Try with DataFrame first, if that fails, try with file path
-        try:
-            metadata = extract_student_metadata(df_students)
-            groups = get_colored_groups(df_students)
-        except (AttributeError, TypeError) as e:
-            print("🔄 Trying with file path instead of DataFrame...")
-            metadata = extract_student_metadata(INPUT_FILE)
-            groups = get_colored_groups(INPUT_FILE)
-        
-    except FileNotFoundError:
-        print(f"❌ Error: File {INPUT_FILE} not found!")
-        return
-    except Exception as e:
-        print(f"❌ Error loading data: {e}")
-        print(f"Please check that {INPUT_FILE} exists and has the correct format.")
-        print(f"Available columns in your CSV: {list(pd.read_csv(INPUT_FILE).columns) if os.path.exists(INPUT_FILE) else 'File not readable'}")
-        return
+        except Exception as e:
+            print(f"❌ Error loading data: {e}")
+            print(f"Please check that {INPUT_FILE} exists and has the correct format.")
+            print(f"Available columns in your CSV: {list(pd.read_csv(INPUT_FILE).columns) if os.path.exists(INPUT_FILE) else 'File not readable'}")
+            return
+        cache.store('conflicts', conflicts_key, (metadata, groups, coloring_report, sessions))
 
     print("\n🧮 Summary of groups and room capacities:")
+    print(f"Coloring path: {coloring_report.get('path', 'unknown')}")
     total_students = 0
     for key, group in groups.items():
         print(f"Group {key}: {len(group)} students")
         total_students += len(group)
     
     print(f"\n📊 Total students: {total_students}")
+    print(f"🗓️ Exam sessions: {len(sessions)}")
+    for label, rows in sessions.items():
+        print(f"  {label}: {rows['StudentID'].nunique()} students")
     
     # Load dynamic room configuration from database
     print("🏗️ Loading room configurations from database...")
-    current_rooms_config = get_rooms_config_from_db()
+    current_rooms_config = load_rooms_config()
     
-    print("\n🏠 Available rooms:")
+    print("\n🏠 Available rooms (every session uses all of them):")
     total_capacity = 0
     for room in current_rooms_config:
         print(f"  {room['room_name']}: {room['capacity']} seats (Years: {room['allowed_years']}, Layout: {room['layout_columns']}×{room['layout_rows']})")
         total_capacity += room['capacity']
     print(f"📊 Total capacity: {total_capacity}")
 
-    if total_students > total_capacity:
-        print(f"⚠️ Warning: Total students ({total_students}) exceed room capacity ({total_capacity})")
-        print("💡 Consider adding more rooms or increasing existing room capacities via admin panel")
+    for label, rows in sessions.items():
+        session_students = rows['StudentID'].nunique()
+        if session_students > total_capacity:
+            print(f"⚠️ Warning: Session {label} has {session_students} students, more than the room capacity ({total_capacity})")
+            print("💡 Consider adding more rooms or increasing existing room capacities via admin panel")
 
-    # Step 2: Assign rooms with constraint checking
-    print("\n🏫 Assigning groups to classrooms...")
-    try:
-        room_assignment = assign_rooms_to_groups(
-            groups=groups,
-            student_metadata=metadata,
-            rooms_config=current_rooms_config
-        )
-        
-        print("\n✅ Room assignment successful!")
-        for room, students in room_assignment.items():
+    # Step 2: Assign rooms, each session independently and in parallel
+    print("\n🏫 Assigning groups to classrooms per session...")
+    # The last published plan of a session is repaired rather than replaced, so a
+    # room edit only moves the students it displaces; being an input of the search,
+    # it is part of the assignment key
+    published = {}
+    for label in sessions:
+        hit, previous_rooms = cache.load('published', fingerprint('published', label))
+        if hit:
+            published[label] = previous_rooms
+    session_keys = {
+        label: fingerprint('assignment', conflicts_key, label, current_rooms_config, algorithm_options, fit_policy,
+                           PORTFOLIO_SEEDS, fingerprint('previous', published.get(label)))
+        for label in sessions
+    }
+    results = {}
+    for label, key in session_keys.items():
+        hit, cached = cache.load('assignment', key)
+        if hit:
+            results[label] = cached
+            print(f"♻️ {label}: students, room configs and published plan unchanged, reusing cached rooms")
+    tasks = list(session_tasks(groups, {label: rows for label, rows in sessions.items() if label not in results}))
+    metadata_of = {label: task_metadata for label, _, task_metadata in tasks}
+    published = {label: published[label] for label, _, _ in tasks if label in published}
+    failed = []
+    for label, outcome in solve_sessions(tasks, current_rooms_config, fit_policy, workers, published, time_limit, node_limit):
+        print(f"\n🗓️ Session {label}")
+        print(outcome['log'], end='')
+        if outcome['error']:
+            print(f"❌ Error: {outcome['error']}")
+            if outcome['unplaced']:
+                placed = sum(len(students) for students in outcome['rooms'].values())
+                print(f"  Best partial assignment placed {placed} students; not placed: "
+                      f"{', '.join(entry['student_id'] for entry in outcome['unplaced'])}")
+            failed.append(label)
+            continue
+        print(f"✅ Room assignment successful for {label}!")
+        for room, students in outcome['rooms'].items():
             if students:
                 print(f"  {room}: {len(students)} students assigned")
-        
-    except ValueError as e:
-        print(f"❌ Error: {e}")
+        # Stored as each session finishes, so an interrupted run resumes from here
+        results[label] = {
+            'report': outcome['report'], 'rooms': outcome['rooms'],
+            'unplaced': outcome['unplaced'], 'metadata': metadata_of[label]
+        }
+        cache.store('assignment', session_keys[label], results[label])
+        cache.store('published', fingerprint('published', label), outcome['rooms'])
+
+    if failed:
+        print(f"\n❌ No room assignment for session(s): {', '.join(failed)}")
         print("\n💡 Suggestions to fix:")
         print("1. Use admin panel to increase room capacities")
         print("2. Use admin panel to increase max_subjects or max_branches limits")
         print("3. Use admin panel to add more rooms")
         print("4. Check if year/branch constraints are too restrictive in admin panel")
         return
-    except Exception as e:
-        print(f"❌ Unexpected error: {e}")
-        return
 
-    # Step 3: Create seat layout
-    print("\n💺 Generating seat numbers...")
-    try:
-        room_config_dict = {room['room_name']: room for room in current_rooms_config}
-        final_layout = assign_seats_in_room(
-            room_assignment=room_assignment,
-            metadata=metadata,
-            room_config=room_config_dict
-        )
-    except Exception as e:
-        print(f"❌ Error in seat assignment: {e}")
-        return
+    for label in sessions:
+        rooms_report = results[label]['report']
+        print(f"{label}: room assignment path {rooms_report.get('path', 'unknown')}")
+        if 'moved' in rooms_report:
+            print(f"  Warm start: {rooms_report['kept']} students kept their room, {rooms_report['moved']} moved")
+        if rooms_report.get('spilled'):
+            print(f"  Spill-over: {rooms_report['spilled']} students moved to another room with free seats")
+        if rooms_report.get('portfolio'):
+            portfolio = rooms_report['portfolio']
+            print(f"  Portfolio seeds: {portfolio['seeds']}, winner: {portfolio['winner'] or 'none'}")
 
-    # Step 4: Export CSV files
-    print("\n📊 Exporting room data to CSV...")
-    for room, seats in final_layout.items():
-        if not seats:
-            continue
-            
-        room_data = []
-        for seat in seats:
-            student_id = seat['student_id']
-            info = metadata.get(student_id, {})
-            room_data.append({
-                'SeatNo': seat['seat_no'],
-                'StudentID': student_id,
-                'Name': info.get('Name', 'Unknown'),
-                'Department': info.get('Department', 'Unknown'),
-                'Branch': info.get('Branch', 'Unknown'),
-                'Batch': info.get('Batch', 'Unknown'),
-                'Year': info.get('Year', 'Unknown'),
-                'Semester': info.get('Semester', 'Unknown'),
-                'Subject': info.get('Subject', 'Unknown'),
-                'ExamDate': info.get('ExamDate', 'Unknown'),
-                'ExamTime': info.get('ExamTime', 'Unknown'),
-                'Room': room,
-                'Position_X': seat['x'],
-                'Position_Y': seat['y']
-            })
-        
-        if room_data:
-            df = pd.DataFrame(room_data)
-            csv_path = f"exports/{room}_seating.csv"
-            df.to_csv(csv_path, index=False)
-            print(f"  ✅ {room}: {len(room_data)} students exported to {csv_path}")
+    # Steps 3-5: Seat, export and render every room of every session on a worker pool
+    print("\n🪑 Generating seat numbers, CSV exports and interactive classroom maps per room...")
+    rooms_key = fingerprint('rooms', session_keys)
+    hit, cached = cache.load('rooms', rooms_key)
+    if hit and files_unchanged(cached['files']):
+        layouts, room_unplaced = cached['layouts'], cached['unplaced']
+        print(f"♻️ Room assignment unchanged, keeping seats and {len(cached['files'])} exported and rendered files")
+    else:
+        room_work = [
+            task
+            for label in sessions
+            for task in room_tasks(label, results[label]['rooms'], results[label]['metadata'], current_rooms_config)
+        ]
+        started = time.perf_counter()
+        room_outcomes = solve_rooms(room_work, workers)
+        elapsed = time.perf_counter() - started
 
-    # Step 5: Create visualizations
-    print("\n🎨 Generating interactive classroom maps...")
-    room_names = []
-    for room, seats in final_layout.items():
-        if not seats:
-            continue
-        try:
-            room_config = next(rc for rc in current_rooms_config if rc['room_name'] == room)
-            html_content = create_simple_html_visualization(
-                room_name=room,
-                seating_arrangement=seats,
-                metadata=metadata,
-                room_config=room_config
-            )
-            with open(f"visualizations/{room}.html", "w") as f:
-                f.write(html_content)
-            print(f"  ✅ {room}: HTML saved to visualizations/{room}.html")
-            room_names.append(room)
-        except Exception as e:
-            print(f"❌ Error creating visualization for {room}: {e}")
+        # Merged in session order, then in each session's room order, however the rooms finished
+        layouts = {label: {} for label in sessions}
+        room_unplaced = {label: [] for label in sessions}
+        written = []
+        room_failed = False
+        for task, outcome in room_outcomes:
+            label, room = task['label'], task['room']
+            print(outcome['log'], end='')
+            if outcome['error']:
+                print(f"❌ Error processing {label} {room}: {outcome['error']}")
+                room_failed = True
+                continue
+            layouts[label][room] = outcome['seats']
+            room_unplaced[label].extend(outcome['unplaced'])
+            written.extend(outcome['files'])
+            timing = outcome['timing']
+            print(f"  ✅ {label} {room}: {len(outcome['seats'])} seats → {', '.join(outcome['files'])} "
+                  f"(⏱️ seats {timing['seats']:.2f}s, CSV {timing['csv']:.2f}s, HTML {timing['html']:.2f}s)")
+        room_seconds = sum(sum(outcome['timing'].values()) for _, outcome in room_outcomes)
+        print(f"⏱️ {len(room_outcomes)} rooms in {elapsed:.2f}s ({room_seconds:.2f}s of room work)")
 
-    if room_names:
-        create_index_page(room_names, final_layout, metadata)
-        print(f"📁 Interactive layouts: visualizations/index.html")
+        all_room_names = []
+        all_layout = {}
+        all_metadata = {}
+        for label in sessions:
+            room_names = list(layouts[label])
+            if room_names:
+                create_index_page(room_names, layouts[label], results[label]['metadata'], output_path=f"visualizations/{label}/index.html")
+                written.append(f"visualizations/{label}/index.html")
+            for room in room_names:
+                # The dashboard links rooms relative to itself, so "<label>/<room>" resolves
+                all_room_names.append(session_room_key(label, room))
+                all_layout[session_room_key(label, room)] = layouts[label][room]
+                all_metadata[session_room_key(label, room)] = results[label]['metadata']
+
+        if all_room_names:
+            create_index_page(all_room_names, all_layout, metadata, room_metadata=all_metadata)
+            print(f"📁 Interactive layouts: visualizations/index.html (per session: visualizations/<session>/index.html)")
+            written.append("visualizations/index.html")
+        if not room_failed:
+            cache.store('rooms', rooms_key, {'layouts': layouts, 'unplaced': room_unplaced, 'files': file_fingerprints(written)})
+
+    # Every student is either seated or listed here, with the room they were assigned
+    unplaced = [
+        (label, entry)
+        for label in sessions
+        for entry in results[label].get('unplaced', []) + room_unplaced[label]
+    ]
+    if unplaced:
+        print(f"\n⚠️ {len(unplaced)} students could not be seated:")
+        for label, entry in unplaced:
+            print(f"  {label} {entry['student_id']} (assigned to {entry['room']}): {entry['reason']}")
+        print("💡 Add seats or rooms that allow these students' years, subjects and branches via admin panel")
 
     print("\n✅ Success!")
     print(f"📁 Room data exports: exports/ folder")
@@ -675,12 +773,29 @@ def main():
 
 def reload_rooms_config():
     """Reload room configurations from database (for use by Flask app)"""
-    global ROOMS_CONFIG
-    ROOMS_CONFIG = get_rooms_config_from_db()
-    return ROOMS_CONFIG
+    global _rooms_config
+    _rooms_config = load_rooms_config()
+    return _rooms_config
 
 def run_seating_pipeline():
     main()
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Generate the exam seating arrangement')
+    parser.add_argument('--strategy', choices=sorted(COLORING_STRATEGIES), default='dsatur',
+                        help='graph coloring strategy for conflict groups')
+    parser.add_argument('--fit-policy', choices=FIT_POLICIES, default='worst_fit',
+                        help='room order when placing groups greedily')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='recompute every stage instead of reusing cached results from data/cache')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='processes coloring conflict components and solving exam sessions in parallel (default: CPU count)')
+    parser.add_argument('--time-limit', type=float, default=SEARCH_TIME_LIMIT,
+                        help=f'seconds the exact room search may run per session (default: {SEARCH_TIME_LIMIT:g})')
+    parser.add_argument('--node-limit', type=int, default=None,
+                        help='search nodes the exact room search may visit per session (default: no limit)')
+    args = parser.parse_args()
+    main(coloring_strategy=args.strategy, use_cache=not args.no_cache, fit_policy=args.fit_policy,
+         workers=args.workers, time_limit=args.time_limit, node_limit=args.node_limit)
\ No newline at end of file
@@ -1,21 +1,56 @@
+import contextlib
+import heapq
+import io
+import multiprocessing
+import os
+import random
+import sys
+import time
+from bisect import bisect_left, insort
 from collections import defaultdict, Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from typing import List, Dict
+from seat_map import room_seat_map
+
+SEARCH_TIME_LIMIT = 30.0  # seconds the exact search may run before giving up
+PROGRESS_INTERVAL = 10_000  # search nodes between progress callbacks
+FAILED_STATE_LIMIT = 200_000  # failed search states remembered, at most
+FIT_POLICIES = ('worst_fit', 'best_fit', 'first_fit')
+PORTFOLIO_SEEDS = (1, 2, 3, 4, 5, 6)  # seeds of the randomized-order FFD runs
+
+def _intern(value):
+    """Share one copy of a repeated string (subject, department, branch) across records"""
+    return sys.intern(value) if isinstance(value, str) else value
 
 class Student:
+    __slots__ = ('id', 'year', 'subject', 'department', 'branch', 'batch')
+
     def __init__(self, student_id: str, metadata: dict):
         self.id = student_id
         self.year = int(metadata.get('Year'))
-        self.subject = metadata.get('Subject')
-        self.department = metadata.get('Department')
-        self.branch = metadata.get('Branch', metadata.get('Batch', 'Unknown'))
-        self.batch = metadata.get('Batch', 'Unknown')
+        self.subject = _intern(metadata.get('Subject'))
+        self.department = _intern(metadata.get('Department'))
+        self.branch = _intern(metadata.get('Branch', metadata.get('Batch', 'Unknown')))
+        self.batch = _intern(metadata.get('Batch', 'Unknown'))
 
 class RoomConfig:
+    __slots__ = ('room_id', 'capacity', 'configured_capacity', 'max_subjects', 'max_branches', 'allowed_years')
+
     def __init__(self, config: dict):
         self.room_id = config['room_name']
-        self.capacity = config['capacity']
-        self.max_subjects = config['max_subjects']
-        self.max_branches = config['max_branches']
+        self.configured_capacity = config['capacity']
+        # A drawn seat map is the room's real capacity; without one, seating still
+        # stops at rows × columns, so that is all the room can take
+        seat_map = room_seat_map(config)
+        if seat_map is None:
+            self.capacity = self.configured_capacity
+        elif config.get('seat_map'):
+            self.capacity = seat_map.capacity
+        else:
+            self.capacity = min(self.configured_capacity, seat_map.capacity)
+        # A blank limit in the admin form is stored as NULL and means no cap
+        self.max_subjects = config['max_subjects'] or 0
+        self.max_branches = config['max_branches'] or 0
         if isinstance(config['allowed_years'], str):
             self.allowed_years = set(map(int, config['allowed_years'].split(',')))
         elif isinstance(config['allowed_years'], list):
@@ -24,10 +59,237 @@ class RoomConfig:
         else:
             self.allowed_years = set(config['allowed_years'])
 
+def _popcount(mask: int) -> int:
+    return bin(mask).count('1')
+
+def _mask(values, bits: Dict) -> int:
+    """Bitmask of values, giving each new value the next free bit"""
+    mask = 0
+    for value in values:
+        mask |= 1 << bits.setdefault(value, len(bits))
+    return mask
+
+class ConstraintBits:
+    """Bit positions of years, subjects and branches, shared by group summaries and rooms"""
+    __slots__ = ('years', 'subjects', 'branches')
+
+    def __init__(self):
+        self.years = {}
+        self.subjects = {}
+        self.branches = {}
+
+    def room_years(self, room: RoomConfig) -> int:
+        return _mask(room.allowed_years, self.years)
+
+class GroupSummary:
+    """
+    What room placement needs to know about one colored group, computed once:
+    its size, student ids and year/subject/branch sets as bitmasks.
+    """
+    __slots__ = ('color', 'student_ids', 'size', 'year_mask', 'subject_mask', 'branch_mask', 'years')
+
+    def __init__(self, color: int, students: List[Student], bits: ConstraintBits):
+        self.color = color
+        self.student_ids = [s.id for s in students]
+        self.size = len(students)
+        self.years = sorted({s.year for s in students})
+        self.year_mask = _mask(self.years, bits.years)
+        self.subject_mask = _mask({s.subject for s in students}, bits.subjects)
+        self.branch_mask = _mask({s.branch for s in students}, bits.branches)
+
+    @property
+    def num_subjects(self) -> int:
+        return _popcount(self.subject_mask)
+
+    @property
+    def num_branches(self) -> int:
+        return _popcount(self.branch_mask)
+
+def summarize_groups(groups: Dict[int, List[Student]], bits: ConstraintBits) -> List[GroupSummary]:
+    return [GroupSummary(color, students, bits) for color, students in groups.items()]
+
+class Infeasibility:
+    """
+    One necessary condition the input violates.
+    kind is 'group' (no room can take a group on its own), 'capacity', 'subjects'
+    or 'branches' (demand of all groups, or of one year, above what the rooms offer);
+    details holds the numbers behind the message.
+    """
+    __slots__ = ('kind', 'message', 'details')
+
+    def __init__(self, kind: str, message: str, **details):
+        self.kind = kind
+        self.message = message
+        self.details = details
+
+    def __repr__(self):
+        return f"Infeasibility({self.kind!r}, {self.message!r})"
+
+class InfeasibleAssignment(ValueError):
+    """Raised before any search when check_feasibility proves there is no assignment"""
+
+    def __init__(self, reasons: List[Infeasibility]):
+        self.reasons = reasons
+        message = reasons[0].message
+        if len(reasons) > 1:
+            message += f" (and {len(reasons) - 1} more problem(s))"
+        super().__init__(message)
+
+def _room_fronts(rooms: List[RoomConfig]) -> Dict[frozenset, List[tuple]]:
+    """
+    Per allowed-years set, the (seats, subject limit, branch limit) room classes not
+    dominated by another class of the set; a limit of 0 (no limit) counts as infinite.
+    """
+    classes = defaultdict(set)
+    for room in rooms:
+        classes[frozenset(room.allowed_years)].add((
+            room.capacity,
+            room.max_subjects if room.max_subjects > 0 else float('inf'),
+            room.max_branches if room.max_branches > 0 else float('inf')
+        ))
+    fronts = {}
+    for years, members in classes.items():
+        front = []
+        for seats, subjects, branches in sorted(members, reverse=True):
+            if not any(s >= subjects and b >= branches for _, s, b in front):
+                front.append((seats, subjects, branches))
+        fronts[years] = front
+    return fronts
+
+def _group_infeasibility(group: GroupSummary, front: List[tuple]):
+    """Why no room class in front can take the group alone, or None when one can"""
+    size, subjects, branches = group.size, group.num_subjects, group.num_branches
+    if any(s >= size and sub >= subjects and b >= branches for s, sub, b in front):
+        return None
+    if not front:
+        return Infeasibility(
+            'group', f"Group {group.color} ({size} students) has years {group.years}, which no room allows together",
+            color=group.color, constraint='years', years=group.years
+        )
+    largest = max(s for s, _, _ in front)
+    if largest < size:
+        return Infeasibility(
+            'group', f"Group {group.color} has {size} students, but the largest room allowing years {group.years} has {largest} seats",
+            color=group.color, constraint='seats', need=size, have=largest
+        )
+    if not any(s >= size and sub >= subjects for s, sub, _ in front):
+        return Infeasibility(
+            'group', f"Group {group.color} has {subjects} subjects, more than max_subjects of every room large enough for it",
+            color=group.color, constraint='subjects', need=subjects
+        )
+    return Infeasibility(
+        'group', f"Group {group.color} has {branches} branches, more than max_branches of every room that fits it otherwise",
+        color=group.color, constraint='branches', need=branches
+    )
+
+def check_feasibility(groups: List[GroupSummary], rooms: List[RoomConfig]) -> List[Infeasibility]:
+    """
+    Necessary conditions for an assignment to exist, checked in one pass over groups
+    and rooms before any search:
+    - every group fits alone in some room allowing all its years (seats, max_subjects
+      and max_branches)
+    - the students of all groups, and of the groups with each year, fit in the seats
+      of the rooms allowing them
+    - their distinct subjects and branches stay within the sum of max_subjects and
+      max_branches of those rooms (a room holds at most that many, none if unlimited)
+    Returns:
+        List of Infeasibility, empty when no condition is violated. An empty list does
+        not prove that an assignment exists
+    """
+    reasons = []
+    fronts = _room_fronts(rooms)
+    compatible = {}  # group years -> merged front of the rooms allowing all of them
+    for group in groups:
+        key = tuple(group.years)
+        if key not in compatible:
+            years = set(key)
+            compatible[key] = [c for allowed, front in fronts.items() if years <= allowed for c in front]
+        reason = _group_infeasibility(group, compatible[key])
+        if reason is not None:
+            reasons.append(reason)
+
+    # Demand and supply per year; year None stands for all groups and all rooms
+    scopes = [None] + sorted({year for group in groups for year in group.years})
+    demand = {year: [0, 0, 0] for year in scopes}  # seats, subject mask, branch mask
+    for group in groups:
+        for year in [None] + group.years:
+            need = demand[year]
+            need[0] += group.size
+            need[1] |= group.subject_mask
+            need[2] |= group.branch_mask
+
+    reported = set()  # a year whose numbers equal the overall ones adds nothing
+    for year in scopes:
+        allowing = [room for room in rooms if year is None or year in room.allowed_years]
+        seats, subjects, branches = demand[year]
+        have = sum(room.capacity for room in allowing)
+        scope = "All groups" if year is None else f"Year {year} groups"
+        if seats > have and ('capacity', seats, have) not in reported:
+            reported.add(('capacity', seats, have))
+            layout_limited = [room.room_id for room in allowing if room.capacity < room.configured_capacity]
+            message = (
+                f"Not enough room capacity! Need {seats} seats, have {have}" if year is None
+                else f"{scope} need {seats} seats, but rooms allowing year {year} have {have}"
+            )
+            if layout_limited:
+                message += f" ({len(layout_limited)} room(s) limited to their seat layout)"
+            reasons.append(Infeasibility(
+                'capacity', message, year=year, need=seats, have=have, layout_limited=layout_limited
+            ))
+        for kind, mask, limits in (
+            ('subjects', subjects, [room.max_subjects for room in allowing]),
+            ('branches', branches, [room.max_branches for room in allowing])
+        ):
+            if not limits or any(limit <= 0 for limit in limits):
+                continue  # no room at all (reported above), or an unlimited room can take them all
+            need, have = _popcount(mask), sum(limits)
+            if need > have and (kind, need, have) not in reported:
+                reported.add((kind, need, have))
+                reasons.append(Infeasibility(
+                    kind, f"{scope} have {need} distinct {kind}, but the rooms allowing them admit at most {have}",
+                    year=year, need=need, have=have
+                ))
+    return reasons
+
+def check_year_capacity(students_by_year: Dict[int, List[str]], rooms: List[RoomConfig]) -> List[Infeasibility]:
+    """
+    Why students that may be split freely across rooms cannot be seated: too few
+    seats overall or for one year. When neither applies, several years compete for
+    the same rooms and a single 'capacity' reason says so.
+    """
+    reasons = []
+    total = sum(len(ids) for ids in students_by_year.values())
+    for year in [None] + sorted(students_by_year):
+        allowing = [room for room in rooms if year is None or year in room.allowed_years]
+        need = total if year is None else len(students_by_year[year])
+        have = sum(room.capacity for room in allowing)
+        if need > have:
+            layout_limited = [room.room_id for room in allowing if room.capacity < room.configured_capacity]
+            message = (
+                f"Not enough room capacity! Need {need} seats, have {have}" if year is None
+                else f"Year {year} has {need} students, but rooms allowing year {year} have {have} seats"
+            )
+            if layout_limited:
+                message += f" ({len(layout_limited)} room(s) limited to their seat layout)"
+            reasons.append(Infeasibility('capacity', message, year=year, need=need, have=have, layout_limited=layout_limited))
+    if not reasons:
+        reasons.append(Infeasibility(
+            'capacity', "Years sharing the same rooms need more seats together than those rooms have",
+            year=None, need=total, have=sum(room.capacity for room in rooms), layout_limited=[]
+        ))
+    return reasons
+
 def assign_rooms_to_groups(
     groups: Dict[int, List[str]],
     student_metadata: Dict[str, dict],
-    rooms_config: List[dict]
+    rooms_config: List[dict],
+    time_limit: float = SEARCH_TIME_LIMIT,
+    node_limit: int = None,
+    fit_policy: str = 'worst_fit',
+    portfolio_seeds=PORTFOLIO_SEEDS,
+    workers: int = None,
+    report: dict = None,
+    previous_assignment: Dict[str, List[str]] = None
 ) -> Dict[str, List[str]]:
     """
     Main entry point for room assignment
@@ -35,8 +297,22 @@ def assign_rooms_to_groups(
         groups: Dictionary of colored groups {color: [student_ids]}
         student_metadata: Dictionary of student metadata {student_id: info}
         rooms_config: List of room configuration dictionaries
+        time_limit: Seconds the backtracking fallback may search (None for no limit)
+        node_limit: Search nodes the backtracking fallback may visit (None for no limit)
+        fit_policy: Room order of the greedy pass, one of FIT_POLICIES
+        portfolio_seeds: Seeds of the randomized FFD runs tried when the greedy pass fails
+        workers: Processes for the heuristic portfolio (default: CPU count)
+        report: Optional dict that receives the path taken ('infeasible', 'flow', 'ffd',
+            'portfolio' or 'backtracking', prefixed 'warm-' when the previous assignment
+            was repaired), the maximum fill ratio of the flow path ('max_fill'), the
+            students kept and moved by a warm start ('kept', 'moved') and, when the
+            portfolio ran, its seeds and winner
+        previous_assignment: Earlier result to warm-start from, {room_id: [student_ids]};
+            placements that are still valid are kept and only displaced groups move
     Returns:
-        Dictionary of {room_id: [student_ids]}
+        Dictionary of {room_id: [student_ids]}; raises InfeasibleAssignment (a
+        ValueError listing its .reasons) when the pre-check proves the input impossible,
+        ValueError when no assignment is found within the search budget
     """
     # Convert rooms config to RoomConfig objects
     room_objects = [RoomConfig(rc) for rc in rooms_config]
@@ -48,103 +324,464 @@ def assign_rooms_to_groups(
             Student(sid, student_metadata[sid]) for sid in student_ids
         ]
     
+    # Sizes and year/subject/branch masks are computed once and shared by every heuristic
+    bits = ConstraintBits()
+    summaries = summarize_groups(student_groups, bits)
+
     print("\n🔍 Group Analysis:")
     total_students = 0
-    for color, students in student_groups.items():
-        subjects = len({s.subject for s in students})
-        branches = len({s.branch for s in students})
-        years = {s.year for s in students}
-        total_students += len(students)
-        print(f"Group {color}: {len(students)} students | Years: {sorted(years)} | Subjects: {subjects} | Branches: {branches}")
+    for group in summaries:
+        total_students += group.size
+        print(f"Group {group.color}: {group.size} students | Years: {group.years} | Subjects: {group.num_subjects} | Branches: {group.num_branches}")
     
     print(f"\n📊 Total students to assign: {total_students}")
     total_capacity = sum(room.capacity for room in room_objects)
     print(f"📊 Total room capacity: {total_capacity}")
+    for room in room_objects:
+        if room.capacity < room.configured_capacity:
+            print(f"⚠️ {room.room_id}: seat layout has only {room.capacity} of its {room.configured_capacity} seats")
     
-    if total_students > total_capacity:
-        raise ValueError(f"Not enough room capacity! Need {total_students} seats, have {total_capacity}")
-    
+    # Without subject or branch caps only seats and years matter, groups can be split
+    # across rooms and max-flow solves the placement exactly; no search needed
+    uncapped = all(room.max_subjects <= 0 and room.max_branches <= 0 for room in room_objects)
+    if uncapped:
+        try:
+            import networkx
+        except ImportError:
+            print("⚠️ networkx is not installed, using the greedy search instead of max-flow")
+            uncapped = False
+    if uncapped:
+        print("\n🎯 No subject or branch caps, solving as a transportation problem...")
+        students_by_year = defaultdict(list)
+        for students in student_groups.values():
+            for student in students:
+                students_by_year[student.year].append(student.id)
+        flow_report = {}
+        flow_result = None
+        if previous_assignment:
+            flow_result = warm_flow_assign(students_by_year, room_objects, previous_assignment, flow_report)
+            if flow_result is None:
+                print("❌ Warm start failed, solving from scratch...")
+        path = 'warm-flow' if flow_result is not None else 'flow'
+        if flow_result is None:
+            flow_result = flow_assign(students_by_year, room_objects, flow_report)
+        if flow_result is None:
+            reasons = check_year_capacity(students_by_year, room_objects)
+            for reason in reasons:
+                print(f"❌ {reason.message}")
+            if report is not None:
+                report['path'] = 'infeasible'
+            raise InfeasibleAssignment(reasons)
+        print("✅ Max-flow successful!")
+        if report is not None:
+            report.update(flow_report)
+            report['path'] = path
+        return flow_result
+
+    # Reject impossible inputs before the (possibly exponential) search
+    reasons = check_feasibility(summaries, room_objects)
+    if reasons:
+        for reason in reasons:
+            print(f"❌ {reason.message}")
+        if report is not None:
+            report['path'] = 'infeasible'
+        raise InfeasibleAssignment(reasons)
+
+    if previous_assignment:
+        print("\n🎯 Repairing the previous assignment...")
+        warm_result = warm_start_assign(summaries, room_objects, bits, previous_assignment, fit_policy, report)
+        if warm_result is not None:
+            print("✅ Warm start successful!")
+            if report is not None:
+                report['path'] = 'warm-ffd'
+            return warm_result
+        print("❌ Warm start failed, solving from scratch...")
+
     # Try modified FFD first
     print("\n🎯 Trying First-Fit Decreasing algorithm...")
-    ffd_result = first_fit_decreasing(student_groups, room_objects)
+    ffd_result = first_fit_decreasing(summaries, room_objects, bits, fit_policy)
     if ffd_result is not None: # Check for None to handle potential failure of FFD
         print("✅ FFD successful!")
+        if report is not None:
+            report['path'] = 'ffd'
         return ffd_result
+
+    # Other heuristics, in parallel, before the exhaustive search
+    print("❌ FFD failed, trying a portfolio of randomized heuristics...")
+    portfolio_report = {}
+    portfolio_result = portfolio_assign(summaries, room_objects, bits, fit_policy, portfolio_seeds, workers, portfolio_report)
+    if report is not None:
+        report['portfolio'] = portfolio_report
+    if portfolio_result is not None:
+        print(f"✅ Portfolio successful with {portfolio_report['winner']}!")
+        if report is not None:
+            report['path'] = 'portfolio'
+        return portfolio_result
     
     # Fallback to backtracking
-    print("❌ FFD failed, trying backtracking algorithm...")
+    print("❌ Portfolio failed, trying backtracking algorithm...")
     try:
-        bt_result = backtracking_assign(student_groups, room_objects)
+        bt_result = backtracking_assign(summaries, room_objects, bits, time_limit, node_limit)
         print("✅ Backtracking successful!")
+        if report is not None:
+            report['path'] = 'backtracking'
         return bt_result
     except ValueError as e:
         print(f"❌ Backtracking also failed: {e}")
         raise
 
+def _year_flow(demand: Dict[int, int], classes: List[tuple], limits: List[int]):
+    """
+    Max-flow from years (supplying their student counts) to room classes (taking at
+    most their limit) over the years each class allows (requires networkx).
+    Returns:
+        (flow value, {(year, class index): students})
+    """
+    import networkx as nx
+
+    G = nx.DiGraph()
+    for year, count in demand.items():
+        G.add_edge('source', ('year', year), capacity=count)
+    for c, (years, _) in enumerate(classes):
+        G.add_edge(('rooms', c), 'sink', capacity=limits[c])
+        for year in years:
+            if year in demand:
+                G.add_edge(('year', year), ('rooms', c))  # no capacity: unbounded
+    if 'source' not in G or 'sink' not in G:
+        return 0, {}
+    value, flow = nx.maximum_flow(G, 'source', 'sink')
+    return value, {
+        (year, c): flow[('year', year)][('rooms', c)]
+        for c, (years, _) in enumerate(classes) for year in years if year in demand
+    }
+
+def flow_assign(students_by_year: Dict[int, List[str]], rooms: List[RoomConfig], report: dict = None) -> Dict[str, List[str]]:
+    """
+    Exact room assignment when no room caps subjects or branches: only seats and
+    allowed years matter, so it is a transportation problem from years to rooms.
+    Rooms allowing the same years are merged into one class, a max-flow decides how
+    many students of each year go to each class, and bisection on the fill ratio
+    finds the smallest maximum room load (seats used / capacity) at which everyone
+    still fits. Each class then shares its students out in proportion to capacity.
+    Students keep their given order within a year, so groups stay mostly together.
+    Args:
+        students_by_year: Dictionary of {year: [student_ids]}
+        rooms: Rooms, none of which limits subjects or branches
+        report: Optional dict that receives the maximum fill ratio ('max_fill')
+    Returns:
+        Dictionary of {room_id: [student_ids]}, or None when the students cannot be seated
+    """
+    demand = {year: len(ids) for year, ids in students_by_year.items() if ids}
+    total = sum(demand.values())
+    if not total:
+        return {}
+    members = defaultdict(list)
+    for r, room in enumerate(rooms):
+        members[frozenset(room.allowed_years)].append(r)
+    classes = list(members.items())
+
+    def room_limits(ratio):
+        return [int(ratio * room.capacity + 1e-9) for room in rooms]
+
+    def solve(ratio):
+        limits = room_limits(ratio)
+        value, flow = _year_flow(demand, classes, [sum(limits[r] for r in rs) for _, rs in classes])
+        return (limits, flow) if value == total else None
+
+    best = solve(1.0)
+    if best is None:
+        return None
+
+    # Room limits only change at ratios k / capacity, which lie at least 1 / max² apart,
+    # so once the bracket is narrower than that its upper end gives the optimal limits
+    largest = max((room.capacity for room in rooms), default=1) or 1
+    lo, hi = total / (sum(room.capacity for room in rooms) or 1), 1.0
+    while hi - lo > 1 / (largest * largest):
+        mid = (lo + hi) / 2
+        found = solve(mid)
+        if found is None:
+            lo = mid
+        else:
+            hi, best = mid, found
+    limits, flow = best
+    print(f"⚖️ Max-flow placement: every room at most {hi:.0%} full")
+    if report is not None:
+        report['max_fill'] = hi
+
+    cursor = {year: 0 for year in demand}
+    assignments = {}
+    for c, (_, rs) in enumerate(classes):
+        students = []
+        for year in sorted(demand):
+            count = flow.get((year, c), 0)
+            students.extend(students_by_year[year][cursor[year]:cursor[year] + count])
+            cursor[year] += count
+
+        # Shares proportional to capacity, then the leftover seats to the emptiest rooms
+        class_capacity = sum(rooms[r].capacity for r in rs) or 1
+        quota = {r: min(limits[r], len(students) * rooms[r].capacity // class_capacity) for r in rs}
+        heap = [(quota[r] / rooms[r].capacity, r) for r in rs if quota[r] < limits[r]]
+        heapq.heapify(heap)
+        for _ in range(len(students) - sum(quota.values())):
+            _, r = heapq.heappop(heap)
+            quota[r] += 1
+            if quota[r] < limits[r]:
+                heapq.heappush(heap, (quota[r] / rooms[r].capacity, r))
+
+        start = 0
+        for r in rs:
+            if quota[r]:
+                assignments[rooms[r].room_id] = students[start:start + quota[r]]
+                start += quota[r]
+    return {room.room_id: assignments[room.room_id] for room in rooms if room.room_id in assignments}
+
+def warm_flow_assign(
+    students_by_year: Dict[int, List[str]],
+    rooms: List[RoomConfig],
+    previous: Dict[str, List[str]],
+    report: dict = None
+) -> Dict[str, List[str]]:
+    """
+    Warm start of flow_assign: students stay in their previous room while it still
+    exists, allows their year and has seats left; the rest are placed by flow_assign
+    in the seats that are still free.
+    Returns:
+        Dictionary of {room_id: [student_ids]}, or None when the displaced students
+        cannot be seated
+    """
+    year_of = {sid: year for year, ids in students_by_year.items() for sid in ids}
+    previous_room = {sid: room_id for room_id, ids in previous.items() for sid in ids}
+    kept, kept_ids = {}, set()
+    residual = []
+    for room in rooms:
+        stay = [
+            sid for sid in previous.get(room.room_id, [])
+            if sid in year_of and sid not in kept_ids and year_of[sid] in room.allowed_years
+        ][:room.capacity]
+        kept[room.room_id] = stay
+        kept_ids.update(stay)
+        residual.append(RoomConfig({
+            'room_name': room.room_id,
+            'capacity': room.capacity - len(stay),
+            'max_subjects': 0,
+            'max_branches': 0,
+            'allowed_years': sorted(room.allowed_years)
+        }))
+
+    displaced = {year: [sid for sid in ids if sid not in kept_ids] for year, ids in students_by_year.items()}
+    print(f"♻️ Warm start: {len(kept_ids)} students keep their room, {len(year_of) - len(kept_ids)} to place")
+    placed = flow_assign(displaced, residual)
+    if placed is None:
+        return None
+    result = {}
+    for room in rooms:
+        ids = kept[room.room_id] + placed.get(room.room_id, [])
+        if ids:
+            result[room.room_id] = ids
+    moved = _count_moved(result, previous_room)
+    print(f"♻️ Warm start moved {moved} of {len(previous_room)} previously placed students")
+    if report is not None:
+        report['kept'] = len(kept_ids)
+        report['moved'] = moved
+        report['max_fill'] = max((len(result.get(room.room_id, [])) / room.capacity for room in rooms if room.capacity), default=0.0)
+    return result
+
+class _MaxTree:
+    """Segment tree over a bucket's rooms (config order) holding their remaining seats"""
+    __slots__ = ('size', 'tree')
+
+    def __init__(self, values: List[int]):
+        self.size = 1
+        while self.size < len(values):
+            self.size *= 2
+        self.tree = [-1] * (2 * self.size)
+        self.tree[self.size:self.size + len(values)] = values
+        for i in reversed(range(1, self.size)):
+            self.tree[i] = max(self.tree[2 * i], self.tree[2 * i + 1])
+
+    def update(self, slot: int, value: int):
+        i = slot + self.size
+        self.tree[i] = value
+        while i > 1:
+            i >>= 1
+            self.tree[i] = max(self.tree[2 * i], self.tree[2 * i + 1])
+
+    def first_at_least(self, seats: int, start: int):
+        """Leftmost slot >= start with at least seats remaining, or None"""
+        if start >= self.size:
+            return None
+        i = start + self.size
+        while True:
+            if self.tree[i] >= seats:
+                while i < self.size: # Descend to the leftmost leaf that fits
+                    i = 2 * i if self.tree[2 * i] >= seats else 2 * i + 1
+                return i - self.size
+            while i & 1: # Climb while i is a right child
+                i >>= 1
+            if i == 0:
+                return None
+            i += 1
+
+class RoomPool:
+    """
+    Rooms indexed by remaining capacity for the greedy placement heuristics.
+    Rooms are bucketed by allowed-year mask, so a group only looks at buckets that
+    admit all of its years. Within a bucket, worst_fit and best_fit keep sorted
+    (-seats, room) / (seats, room) keys and bisect straight to the rooms with enough
+    seats; first_fit keeps a segment tree of seats in config order and jumps to the
+    next room that fits. Candidates of several buckets are merged lazily, so a query
+    costs O(log R) plus one step per room rejected by the subject/branch checks.
+    """
+
+    def __init__(self, rooms: List[RoomConfig], bits: ConstraintBits, policy: str = 'worst_fit'):
+        if policy not in FIT_POLICIES:
+            raise ValueError(f"Unknown fit policy '{policy}'. Available: {', '.join(FIT_POLICIES)}")
+        self.policy = policy
+        self.remaining = [room.capacity for room in rooms]
+        self.bucket_of = [bits.room_years(room) for room in rooms]
+        self.buckets = defaultdict(list)  # allowed-year mask -> room indices in config order
+        self.slot_of = []
+        for r, mask in enumerate(self.bucket_of):
+            self.slot_of.append(len(self.buckets[mask]))
+            self.buckets[mask].append(r)
+        if policy == 'first_fit':
+            self.trees = {
+                mask: _MaxTree([self.remaining[r] for r in members])
+                for mask, members in self.buckets.items()
+            }
+        else:
+            self.keys = {
+                mask: sorted(self._key(r) for r in members)
+                for mask, members in self.buckets.items()
+            }
+        self.compatible = {}  # group year mask -> bucket masks admitting it
+
+    def _key(self, r: int):
+        seats = self.remaining[r]
+        return (-seats, r) if self.policy == 'worst_fit' else (seats, r)
+
+    def _bucket_candidates(self, mask: int, seats: int):
+        if self.policy == 'first_fit':
+            members, tree = self.buckets[mask], self.trees[mask]
+            slot = tree.first_at_least(seats, 0)
+            while slot is not None:
+                yield (members[slot],)
+                slot = tree.first_at_least(seats, slot + 1)
+        elif self.policy == 'worst_fit':
+            # Index from the bisect point rather than slicing, so a query copies nothing
+            keys = self.keys[mask]
+            for i in range(bisect_left(keys, (-seats + 1,))):
+                yield keys[i]
+        else:
+            keys = self.keys[mask]
+            for i in range(bisect_left(keys, (seats,)), len(keys)):
+                yield keys[i]
+
+    def candidates(self, year_mask: int, seats: int):
+        """Rooms admitting every year in year_mask with at least seats left, best first"""
+        buckets = self.compatible.get(year_mask)
+        if buckets is None:
+            buckets = [mask for mask in self.buckets if not year_mask & ~mask]
+            self.compatible[year_mask] = buckets
+        streams = [self._bucket_candidates(mask, seats) for mask in buckets]
+        keys = streams[0] if len(streams) == 1 else heapq.merge(*streams)
+        return (key[-1] for key in keys)
+
+    def take(self, r: int, seats: int):
+        """Use seats of room r; call after the candidates iteration has stopped"""
+        mask = self.bucket_of[r]
+        if self.policy == 'first_fit':
+            self.remaining[r] -= seats
+            self.trees[mask].update(self.slot_of[r], self.remaining[r])
+        else:
+            keys = self.keys[mask]
+            del keys[bisect_left(keys, self._key(r))]
+            self.remaining[r] -= seats
+            insort(keys, self._key(r))
+
 def first_fit_decreasing(
-    groups: Dict[int, List[Student]],
-    rooms: List[RoomConfig]
+    groups: List[GroupSummary],
+    rooms: List[RoomConfig],
+    bits: ConstraintBits,
+    policy: str = 'worst_fit',
+    seed: int = None,
+    placed: Dict[int, List[GroupSummary]] = None,
+    stop=None
 ) -> Dict[str, List[str]]:
-    """Modified First-Fit Decreasing algorithm with flexible constraints"""
-    sorted_groups = sorted(groups.values(), key=lambda x: len(x), reverse=True)
+    """
+    Modified First-Fit Decreasing algorithm with flexible constraints.
+    Groups go largest first into the first room, in policy order, that passes every
+    constraint: worst_fit tries the emptiest rooms first (the original behaviour),
+    best_fit the tightest fit and first_fit the config order.
+    With a seed, group sizes are jittered by up to 25% before sorting, so groups of
+    similar size are tried in a different (reproducible) order.
+    placed maps room indices to groups already sitting there (a warm start); they
+    are kept and only groups are placed around them.
+    stop is an optional event (e.g. multiprocessing.Event); once it is set the pass
+    gives up at the next group and returns None.
+    """
+    if seed is None:
+        sorted_groups = sorted(groups, key=lambda x: x.size, reverse=True)
+    else:
+        rng = random.Random(seed)
+        sorted_groups = sorted(groups, key=lambda x: x.size * rng.uniform(0.75, 1.25), reverse=True)
+    pool = RoomPool(rooms, bits, policy)
     assignments = defaultdict(list)
-    room_status = {
-        room.room_id: {
-            'remaining_capacity': room.capacity,
-            'subjects': set(),
-            'branches': set(),
-            'years': set(),
+    room_status = [
+        {
+            'subjects': 0,
+            'branches': 0,
+            'years': 0,
             'students': []
         } for room in rooms
-    }
+    ]
+    for r, kept in (placed or {}).items():
+        status = room_status[r]
+        for group in kept:
+            pool.take(r, group.size)
+            status['subjects'] |= group.subject_mask
+            status['branches'] |= group.branch_mask
+            status['years'] |= group.year_mask
+            assignments[rooms[r].room_id].extend(group.student_ids)
+            status['students'].extend(group.student_ids)
 
-    print(f"🔄 Processing {len(sorted_groups)} groups...")
+    print(f"🔄 Processing {len(sorted_groups)} groups ({policy})...")
     
     all_groups_placed_successfully = True # Flag to track overall success of FFD
 
     for i, group in enumerate(sorted_groups):
+        if stop is not None and stop.is_set():
+            print(" ⏹️ Stopped: another heuristic already found an assignment")
+            return None
         placed_current_group = False # Renamed 'placed' to be more specific
-        group_years = {s.year for s in group}
-        group_subjects = {s.subject for s in group}
-        group_branches = {s.branch for s in group}
-        print(f" 📦 Group {i}: {len(group)} students, Years: {sorted(group_years)}, Subjects: {len(group_subjects)}, Branches: {len(group_branches)}")
-
-        # Try each room, sorted by remaining capacity (prefer less full rooms)
-        sorted_rooms = sorted(rooms, key=lambda x: room_status[x.room_id]['remaining_capacity'], reverse=True)
-        
-        for room in sorted_rooms:
-            status = room_status[room.room_id]
-
-            # Check capacity
-            if len(group) > status['remaining_capacity']:
-                continue
+        print(f" 📦 Group {i}: {group.size} students, Years: {group.years}, Subjects: {group.num_subjects}, Branches: {group.num_branches}")
 
-            # Check year constraints
-            if not group_years.issubset(room.allowed_years):
-                continue
+        # The pool only yields rooms with enough seats that allow all the group's years
+        for r in pool.candidates(group.year_mask, group.size):
+            room, status = rooms[r], room_status[r]
             
             # Check subject constraints
-            if room.max_subjects > 0 and len(status['subjects'].union(group_subjects)) > room.max_subjects:
+            if room.max_subjects > 0 and _popcount(status['subjects'] | group.subject_mask) > room.max_subjects:
                 continue
 
             # Check branch constraints
-            if room.max_branches > 0 and len(status['branches'].union(group_branches)) > room.max_branches:
+            if room.max_branches > 0 and _popcount(status['branches'] | group.branch_mask) > room.max_branches:
                 continue
 
             # If all constraints met, assign students to this room
-            status['remaining_capacity'] -= len(group)
-            status['subjects'].update(group_subjects)
-            status['branches'].update(group_branches)
-            status['years'].update(group_years)
-            assignments[room.room_id].extend([s.id for s in group])
-            status['students'].extend([s.id for s in group])
             placed_current_group = True
-            print(f" ✅ Placed group in {room.room_id}. Remaining capacity: {status['remaining_capacity']}")
-            # IMPORTANT: Ensure no 'return room.room_id' or similar is here.
             break # Exit inner loop, move to next group
 
-        if not placed_current_group:
-            print(f" ⚠️ Could not place group of {len(group)} students. No suitable room found.")
+        if placed_current_group:
+            pool.take(r, group.size)
+            status['subjects'] |= group.subject_mask
+            status['branches'] |= group.branch_mask
+            status['years'] |= group.year_mask
+            assignments[room.room_id].extend(group.student_ids)
+            status['students'].extend(group.student_ids)
+            print(f" ✅ Placed group in {room.room_id}. Remaining capacity: {pool.remaining[r]}")
+        else:
+            print(f" ⚠️ Could not place group of {group.size} students. No suitable room found.")
             all_groups_placed_successfully = False # Mark overall FFD as failed
             break # Exit outer loop if a group cannot be placed
     
@@ -155,11 +792,450 @@ def first_fit_decreasing(
     final_assignments = {rid: s_ids for rid, s_ids in assignments.items() if s_ids}
     return final_assignments
 
+def _count_moved(assignment: Dict[str, List[str]], previous_room: Dict[str, str]) -> int:
+    """Students of a previous assignment that now sit in a different room"""
+    return sum(
+        1 for room_id, ids in assignment.items() for sid in ids
+        if sid in previous_room and previous_room[sid] != room_id
+    )
+
+def warm_start_assign(
+    groups: List[GroupSummary],
+    rooms: List[RoomConfig],
+    bits: ConstraintBits,
+    previous: Dict[str, List[str]],
+    policy: str = 'worst_fit',
+    report: dict = None
+) -> Dict[str, List[str]]:
+    """
+    Repair a previous assignment instead of solving from scratch, so that a room
+    edit only moves the students it has to.
+    Each group stays in the room that held most of its students if it still passes
+    every constraint there (largest groups first, so fewer students move); groups
+    that are new or no longer fit are placed around them by first_fit_decreasing.
+    Args:
+        previous: Earlier result of assign_rooms_to_groups, {room_id: [student_ids]}
+        report: Optional dict that receives how many students were kept ('kept')
+            and moved ('moved')
+    Returns:
+        Dictionary of {room_id: [student_ids]}, or None when the displaced groups
+        cannot be placed
+    """
+    room_index = {room.room_id: r for r, room in enumerate(rooms)}
+    previous_room = {sid: room_id for room_id, ids in previous.items() for sid in ids}
+    used = [[0, 0, 0] for _ in rooms]  # seats, subject mask, branch mask
+    placed, displaced = defaultdict(list), []
+    for group in sorted(groups, key=lambda x: x.size, reverse=True):
+        votes = Counter(previous_room[sid] for sid in group.student_ids if sid in previous_room)
+        r = room_index.get(votes.most_common(1)[0][0]) if votes else None
+        if r is not None:
+            room, state = rooms[r], used[r]
+            subjects, branches = state[1] | group.subject_mask, state[2] | group.branch_mask
+            if (
+                not group.year_mask & ~bits.room_years(room)
+                and state[0] + group.size <= room.capacity
+                and (room.max_subjects <= 0 or _popcount(subjects) <= room.max_subjects)
+                and (room.max_branches <= 0 or _popcount(branches) <= room.max_branches)
+            ):
+                state[0] += group.size
+                state[1], state[2] = subjects, branches
+                placed[r].append(group)
+                continue
+        displaced.append(group)
+
+    print(f"♻️ Warm start: {len(groups) - len(displaced)} groups keep their room, {len(displaced)} to repair")
+    result = first_fit_decreasing(displaced, rooms, bits, policy, placed=placed)
+    if result is None:
+        return None
+    moved = _count_moved(result, previous_room)
+    print(f"♻️ Warm start moved {moved} of {len(previous_room)} previously placed students")
+    if report is not None:
+        report['kept'] = sum(group.size for kept in placed.values() for group in kept)
+        report['moved'] = moved
+    return result
+
+def _portfolio_entry_name(policy: str, seed: int) -> str:
+    return policy if seed is None else f"randomized_ffd({policy}, seed={seed})"
+
+_portfolio_stop = None  # set in each portfolio worker by _init_portfolio_worker
+
+def _init_portfolio_worker(stop):
+    global _portfolio_stop
+    _portfolio_stop = stop
+
+def _run_portfolio_entry(groups, rooms, bits, policy, seed):
+    """One portfolio heuristic, with FFD's per-group printing silenced"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        return first_fit_decreasing(groups, rooms, bits, policy, seed, stop=_portfolio_stop)
+
+def portfolio_assign(
+    groups: List[GroupSummary],
+    rooms: List[RoomConfig],
+    bits: ConstraintBits,
+    fit_policy: str = 'worst_fit',
+    seeds=PORTFOLIO_SEEDS,
+    workers: int = None,
+    report: dict = None
+) -> Dict[str, List[str]]:
+    """
+    Run a portfolio of greedy heuristics concurrently and keep the first feasible
+    assignment: FFD with every fit policy other than fit_policy (already tried), and
+    FFD with fit_policy in a randomized group order for each seed. When a winner
+    arrives, heuristics that have not started are cancelled and running ones are
+    told to stop through a shared event, so no worker outlives the call.
+    Args:
+        groups: Summaries of the colored groups
+        rooms: Rooms in config order
+        bits: Bit positions the group summaries were encoded with
+        fit_policy: Policy of the greedy pass that already failed
+        seeds: Seeds of the randomized FFD runs
+        workers: Process count (default: CPU count); 1 runs them in order in-process
+        report: Optional dict that receives the seeds and the winning heuristic, so
+            the winner can be rerun on its own with first_fit_decreasing
+    Returns:
+        The winning assignment, or None when every heuristic failed
+    """
+    entries = [(policy, None) for policy in FIT_POLICIES if policy != fit_policy]
+    entries += [(fit_policy, seed) for seed in seeds]
+    if report is not None:
+        report.update({'seeds': list(seeds), 'winner': None, 'winner_policy': None, 'winner_seed': None})
+
+    winner, result = None, None
+    workers = min(workers or os.cpu_count() or 1, len(entries))
+    if workers <= 1:
+        for policy, seed in entries:
+            result = _run_portfolio_entry(groups, rooms, bits, policy, seed)
+            if result is not None:
+                winner = (policy, seed)
+                break
+    else:
+        stop = multiprocessing.Event()
+        executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_portfolio_worker, initargs=(stop,))
+        try:
+            futures = {
+                executor.submit(_run_portfolio_entry, groups, rooms, bits, policy, seed): (policy, seed)
+                for policy, seed in entries
+            }
+            for future in as_completed(futures):
+                result = future.result()
+                if result is not None:
+                    winner = futures[future]
+                    break
+        finally:
+            # Queued heuristics never start; running ones give up at their next group
+            stop.set()
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    if winner is None:
+        return None
+    if report is not None:
+        report.update({'winner': _portfolio_entry_name(*winner), 'winner_policy': winner[0], 'winner_seed': winner[1]})
+    return result
+
+class SearchStats:
+    """Counters of a running room search; passed to the progress callback"""
+    __slots__ = ('status', 'nodes', 'backtracks', 'pruned', 'depth', 'best_depth', 'num_groups', 'elapsed')
+
+    def __init__(self, num_groups: int):
+        self.status = 'running'  # then 'complete', 'infeasible' or 'budget'
+        self.nodes = 0
+        self.backtracks = 0
+        self.pruned = 0
+        self.depth = 0
+        self.best_depth = 0
+        self.num_groups = num_groups
+        self.elapsed = 0.0
+
+    def summary(self) -> str:
+        return (f"{self.nodes} nodes, {self.backtracks} backtracks, {self.pruned} pruned, "
+                f"depth {self.depth}/{self.num_groups}, best {self.best_depth}/{self.num_groups}, "
+                f"{self.elapsed:.1f}s")
+
+class SearchResult:
+    """
+    Outcome of search_room_assignment.
+    assignments holds the complete assignment, or the best partial one when the
+    search ran out of budget; unplaced lists the groups missing from it.
+    """
+    __slots__ = ('assignments', 'unplaced', 'stats')
+
+    def __init__(self, assignments: Dict[str, List[str]], unplaced: List[GroupSummary], stats: SearchStats):
+        self.assignments = assignments
+        self.unplaced = unplaced
+        self.stats = stats
+
+    @property
+    def complete(self) -> bool:
+        return self.stats.status == 'complete'
+
+class SearchBudgetExceeded(ValueError):
+    """Raised by backtracking_assign when the budget runs out; carries the partial result"""
+
+    def __init__(self, result: SearchResult):
+        self.result = result
+        unplaced_students = sum(group.size for group in result.unplaced)
+        super().__init__(
+            f"Room search stopped after {result.stats.summary()}: "
+            f"{len(result.unplaced)} groups ({unplaced_students} students) could not be placed"
+        )
+
+def print_search_progress(stats: SearchStats):
+    # stderr, so progress shows while the search runs even when stdout is captured
+    print(f"  ⏳ Searching: {stats.summary()}", file=sys.stderr, flush=True)
+
+def search_room_assignment(
+    groups: List[GroupSummary],
+    rooms: List[RoomConfig],
+    bits: ConstraintBits,
+    time_limit: float = SEARCH_TIME_LIMIT,
+    node_limit: int = None,
+    progress=None
+) -> SearchResult:
+    """
+    Exact, anytime room search with an explicit stack (no recursion limit).
+    Subjects, branches and years are encoded as integer bitmasks and room state is
+    kept in flat lists; each placement pushes the room's previous state on a trail
+    that is popped on backtrack, so nothing is copied or rescanned per step.
+
+    Symmetric branches are skipped: of several rooms with the same configuration and
+    the same current state only the first is tried, and a group identical to the one
+    before it never goes to an earlier room than that one. States that already failed
+    are remembered and not searched again, and a state whose usable seats cannot hold
+    the remaining groups is abandoned at once. None of this changes which assignment
+    is found, only how much of the tree is explored to find it.
+
+    Args:
+        groups: Summaries of the colored groups
+        rooms: Rooms in the order they are tried
+        bits: Bit positions the group summaries were encoded with
+        time_limit: Seconds before the search stops (None for no limit)
+        node_limit: Search nodes before the search stops (None for no limit)
+        progress: Called with the SearchStats every PROGRESS_INTERVAL nodes
+    Returns:
+        SearchResult; when stats.status is 'budget' it holds the partial assignment
+        placing the most students, and when 'infeasible' no assignment exists
+    """
+    start_time = time.perf_counter()
+    deadline = None if time_limit is None else start_time + time_limit
+    sorted_groups = sorted(groups, key=lambda x: x.size, reverse=True)
+
+    # Flat per-group and per-room lists keep attribute lookups out of the search loop
+    group_sizes = [group.size for group in sorted_groups]
+    group_years = [group.year_mask for group in sorted_groups]
+    group_subjects = [group.subject_mask for group in sorted_groups]
+    group_branches = [group.branch_mask for group in sorted_groups]
+
+    allowed_years = [bits.room_years(room) for room in rooms]
+    max_subjects = [room.max_subjects for room in rooms]
+    max_branches = [room.max_branches for room in rooms]
+    remaining = [room.capacity for room in rooms]
+    subjects = [0] * len(rooms)
+    branches = [0] * len(rooms)
+
+    # Rooms that only differ in name are interchangeable while their state matches
+    room_classes = [
+        (room.capacity, max_subjects[r], max_branches[r], allowed_years[r])
+        for r, room in enumerate(rooms)
+    ]
+    class_sizes = Counter(room_classes)
+    has_twin = [class_sizes[room_class] > 1 for room_class in room_classes]
+    same_as_previous = [False] + [
+        (group_sizes[g], group_years[g], group_subjects[g], group_branches[g]) ==
+        (group_sizes[g - 1], group_years[g - 1], group_subjects[g - 1], group_branches[g - 1])
+        for g in range(1, len(sorted_groups))
+    ]
+
+    # Seats still needed by the groups from index onwards
+    seats_needed = [0] * (len(sorted_groups) + 1)
+    for g in reversed(range(len(sorted_groups))):
+        seats_needed[g] = seats_needed[g + 1] + group_sizes[g]
+    smallest_group = group_sizes[-1] if group_sizes else 0
+
+    placement = [None] * len(sorted_groups)
+    trail = []
+    # (group index, lowest allowed room, state hash) -> room signature, for states with no completion
+    failed = {}
+
+    # Room state is hashed incrementally: every room contributes a hash of its
+    # (usable seats, subjects, branches) and the state hash is their XOR, so a
+    # placement only rehashes the one room it changes
+    def room_hash(r):
+        seats = remaining[r] if remaining[r] >= smallest_group else 0
+        return seats, hash((r, seats, subjects[r], branches[r]))
+
+    room_usable, room_hashes = [], []
+    for r in range(len(rooms)):
+        seats, h = room_hash(r)
+        room_usable.append(seats)
+        room_hashes.append(h)
+    usable_total = sum(room_usable)
+    state_hash = 0
+    for h in room_hashes:
+        state_hash ^= h
+
+    # Year restrictions never change during the search, so filter them up front
+    candidates = [
+        [r for r in range(len(rooms)) if not years & ~allowed_years[r]]
+        for years in group_years
+    ]
+
+    def can_place(r, g):
+        if group_sizes[g] > remaining[r]:
+            return False
+        if max_subjects[r] > 0 and _popcount(subjects[r] | group_subjects[g]) > max_subjects[r]:
+            return False
+        if max_branches[r] > 0 and _popcount(branches[r] | group_branches[g]) > max_branches[r]:
+            return False
+        return True
+
+    def rehash(r):
+        nonlocal usable_total, state_hash
+        seats, h = room_hash(r)
+        usable_total += seats - room_usable[r]
+        state_hash ^= room_hashes[r] ^ h
+        room_usable[r], room_hashes[r] = seats, h
+
+    def place(r, g):
+        trail.append((r, remaining[r], subjects[r], branches[r]))
+        remaining[r] -= group_sizes[g]
+        subjects[r] |= group_subjects[g]
+        branches[r] |= group_branches[g]
+        placement[g] = r
+        rehash(r)
+
+    def undo():
+        r, remaining[r], subjects[r], branches[r] = trail.pop()
+        rehash(r)
+
+    def signature():
+        """
+        Room state as seen by the remaining groups: rooms too small for any of them
+        count as full. Only built when a state fails or its hash matches a failed one.
+        """
+        return tuple(room_usable), tuple(subjects), tuple(branches)
+
+    stats = SearchStats(len(sorted_groups))
+    best_placement = []
+
+    # frames[g] = [next candidate position, room states tried, failure key] for the
+    # group being placed at depth g; groups 0..len(frames)-2 are placed
+    frames = []
+    descend = True
+    while True:
+        if descend:
+            index = len(frames)
+            if index == len(sorted_groups):
+                stats.status = 'complete'  # All groups assigned
+                break
+            if index > stats.best_depth or not best_placement:
+                stats.best_depth = index
+                best_placement = placement[:index]
+
+            stats.nodes += 1
+            if progress is not None and stats.nodes % PROGRESS_INTERVAL == 0:
+                stats.depth, stats.elapsed = index, time.perf_counter() - start_time
+                progress(stats)
+            # The clock is read on every node (far cheaper than the node itself), so the
+            # search stops within one node of the time limit however slow nodes get
+            if deadline is not None and time.perf_counter() > deadline:
+                stats.status = 'budget'
+                break
+            if node_limit is not None and stats.nodes >= node_limit:
+                stats.status = 'budget'
+                break
+
+            lowest = placement[index - 1] if same_as_previous[index] else -1
+            state = (index, lowest, state_hash)
+            # Not enough usable seats left for the remaining groups, or known dead end
+            if usable_total < seats_needed[index] or (state in failed and failed[state] == signature()):
+                stats.pruned += 1
+                if not frames:
+                    stats.status = 'infeasible'
+                    break
+                undo()  # Take the previous group back out and try its next room
+                descend = False
+                continue
+            frames.append([0, set(), state])
+
+        index = len(frames) - 1
+        frame = frames[-1]
+        position, tried, lowest = frame[0], frame[1], frame[2][1]
+        room_candidates = candidates[index]
+        descend = False
+        while position < len(room_candidates):
+            r = room_candidates[position]
+            position += 1
+            if r < lowest or not can_place(r, index):
+                continue
+            if has_twin[r]:
+                room_state = (room_classes[r], remaining[r], subjects[r], branches[r])
+                if room_state in tried:
+                    continue
+                tried.add(room_state)
+            place(r, index)
+            descend = True
+            break
+        frame[0] = position
+
+        if not descend:
+            if len(failed) < FAILED_STATE_LIMIT:
+                failed.setdefault(frame[2], signature())
+            frames.pop()
+            stats.backtracks += 1
+            if not frames:
+                stats.status = 'infeasible'
+                break
+            undo()
+
+    stats.depth = len(frames)
+    stats.elapsed = time.perf_counter() - start_time
+    if stats.status == 'complete':
+        best_placement = placement
+
+    room_students = defaultdict(list)
+    for group, r in zip(sorted_groups, best_placement):
+        room_students[r].extend(group.student_ids)
+    assignments = {rooms[r].room_id: room_students[r] for r in room_students}
+    return SearchResult(assignments, sorted_groups[len(best_placement):], stats)
+
 def backtracking_assign(
+    groups: List[GroupSummary],
+    rooms: List[RoomConfig],
+    bits: ConstraintBits,
+    time_limit: float = SEARCH_TIME_LIMIT,
+    node_limit: int = None,
+    progress=print_search_progress
+) -> Dict[str, List[str]]:
+    """
+    Backtracking algorithm for room assignment with flexible constraints.
+    Raises SearchBudgetExceeded (a ValueError carrying the best partial result) when
+    the time or node budget runs out; see search_room_assignment.
+    """
+    result = search_room_assignment(groups, rooms, bits, time_limit, node_limit, progress)
+    if result.stats.status == 'budget':
+        raise SearchBudgetExceeded(result)
+    if result.complete:
+        print(f"\n📋 Backtracking Assignment Summary ({result.stats.summary()}):")
+        for room_id, students in result.assignments.items():
+            print(f"  {room_id}: {len(students)} students")
+        return result.assignments
+    
+    raise ValueError("No valid room assignment possible with current constraints")
+
+def backtracking_assign_sets(
     groups: Dict[int, List[Student]],
-    rooms: List[RoomConfig]
+    rooms: List[RoomConfig],
+    time_limit: float = None,
+    stats: dict = None
 ) -> Dict[str, List[str]]:
-    """Backtracking algorithm for room assignment with flexible constraints."""
+    """
+    Original set-copying backtracking search; kept for benchmarking.
+    Raises TimeoutError once time_limit seconds have passed; stats, when given,
+    receives the number of search nodes visited ('nodes').
+    """
+    deadline = None if time_limit is None else time.perf_counter() + time_limit
+    stats = {} if stats is None else stats
+    stats['nodes'] = 0
     sorted_groups = sorted(groups.values(), key=lambda x: len(x), reverse=True)
     room_assignments = defaultdict(list)
     room_status = {
@@ -196,6 +1272,9 @@ def backtracking_assign(
     def dfs(index):
         if index == len(sorted_groups):
             return True # All groups assigned
+        stats['nodes'] += 1
+        if deadline is not None and time.perf_counter() > deadline:
+            raise TimeoutError(f"set-copying search stopped after {stats['nodes']} nodes")
 
         group = sorted_groups[index]
         group_years = {s.year for s in group}
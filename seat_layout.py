@@ -1,9 +1,121 @@
-from collections import defaultdict, deque
+from collections import Counter, defaultdict, deque
+import math
 import random
+import time
+import numpy as np
+from seat_map import SeatMap, room_seat_map
+from room_assignment import RoomConfig
 
-def assign_seats_in_room(room_assignment, metadata, room_config):
-    """Assign seats with year grouping and branch/subject distribution"""
+SUBJECT_WEIGHT = 2  # a same-subject neighbour can share answers; same branch matters less
+BRANCH_WEIGHT = 1
+SEAT_SEARCH_STEPS = 25  # swap attempts per seat in the local search
+SEAT_SEARCH_TIME_LIMIT = 0.5  # seconds of local search per room
+SEAT_SEARCH_TEMPERATURE = 2.0  # initial annealing temperature, cooled linearly
+
+def _room_layout(room, room_config):
+    """SeatMap of a room in room_config ({room_name: room_dict}), else the default 5 × 6 grid"""
+    seat_map = None
+    if isinstance(room_config, dict) and room in room_config:
+        seat_map = room_seat_map(room_config[room])
+    return seat_map or SeatMap(5, 6)
+
+def _student_year(info):
+    try:
+        return int(info.get('Year'))
+    except (TypeError, ValueError):
+        return None
+
+def spill_overflow(room_assignment, metadata, room_config, unplaced=None):
+    """
+    Fit every room's students to its seats. Students beyond a room's seats join a
+    spill-over queue and go, in order, to the next room after theirs (wrapping
+    around) that has a free seat and allows their year, and whose max_subjects and
+    max_branches still hold with them in it. Every configured room is a candidate,
+    including rooms the assignment left empty.
+    Args:
+        room_assignment: Dictionary of {room: [student_ids]}
+        metadata: Student metadata
+        room_config: Dictionary of {room_name: room_dict}
+        unplaced: Optional list; gets {'student_id', 'room', 'reason'} for every
+            student no room could take, so each student is seated or listed here
+    Returns:
+        (rooms, spilled): {room: [student_ids]} with no room over its seats, and
+        {student_id: room it was assigned to} of the students that moved
+    """
+    rooms = {room: list(students) for room, students in room_assignment.items()}
+    seats = {room: _room_layout(room, room_config).capacity for room in rooms}
+    queue = deque()
+    for room, students in rooms.items():
+        if len(students) > seats[room]:
+            print(f"   ⚠️ {room}: {len(students)} students for {seats[room]} seats, {len(students) - seats[room]} spill over")
+            queue.extend((sid, room) for sid in students[seats[room]:])
+            del students[seats[room]:]
+    if not queue:
+        return rooms, {}
+
+    # Rooms the solver left empty are not in the assignment, but can take spill-over too
+    if isinstance(room_config, dict):
+        for room in room_config:
+            if room not in rooms:
+                rooms[room] = []
+                seats[room] = _room_layout(room, room_config).capacity
+    order = list(rooms)
+    limits = {room: RoomConfig(room_config[room]) for room in order if isinstance(room_config, dict) and room in room_config}
+    subjects = {room: {metadata.get(sid, {}).get('Subject') for sid in rooms[room]} for room in limits}
+    branches = {room: {metadata.get(sid, {}).get('Branch') for sid in rooms[room]} for room in limits}
+
+    def accepts(room, info):
+        if len(rooms[room]) >= seats[room]:
+            return False
+        if room not in limits:
+            return True
+        limit = limits[room]
+        subject, branch = info.get('Subject'), info.get('Branch')
+        return (
+            _student_year(info) in limit.allowed_years
+            and (not limit.max_subjects or len(subjects[room] | {subject}) <= limit.max_subjects)
+            and (not limit.max_branches or len(branches[room] | {branch}) <= limit.max_branches)
+        )
+
+    spilled = {}
+    moves = Counter()
+    left = 0
+    while queue:
+        sid, source = queue.popleft()
+        info = metadata.get(sid, {})
+        start = order.index(source)
+        target = next((room for room in order[start + 1:] + order[:start] if accepts(room, info)), None)
+        if target is None:
+            left += 1
+            if unplaced is not None:
+                unplaced.append({'student_id': sid, 'room': source, 'reason': 'no room with a free seat allows this student'})
+            continue
+        rooms[target].append(sid)
+        if target in limits:
+            subjects[target].add(info.get('Subject'))
+            branches[target].add(info.get('Branch'))
+        spilled[sid] = source
+        moves[source, target] += 1
+    for (source, target), count in moves.items():
+        print(f"   ↪️ {source} → {target}: {count} students")
+    if left:
+        print(f"   ❌ {left} students have no free seat in any room that allows them")
+    return rooms, spilled
+
+def assign_seats_in_room(room_assignment, metadata, room_config, unplaced=None):
+    """
+    Assign seats with year grouping and branch/subject distribution. Students a room
+    has no seat for are first moved to another room (see spill_overflow).
+    Args:
+        room_assignment: Dictionary of {room: [student_ids]}
+        metadata: Student metadata
+        room_config: Dictionary of {room_name: room_dict}
+        unplaced: Optional list that receives the students no room could take
+    Returns:
+        Dictionary of {room: [seat dicts]}
+    """
     seating = {}
+    room_assignment, spilled = spill_overflow(room_assignment, metadata, room_config, unplaced)
     
     for room, students in room_assignment.items():
         if not students:  # Skip empty rooms
@@ -23,39 +135,32 @@ def assign_seats_in_room(room_assignment, metadata, room_config):
         # Create interleaved queue
         queue = interleave_groups(year_groups.values())
         
-        # Get room layout configuration
-        if isinstance(room_config, dict) and room in room_config:
-            # New format: room_config[room_name] = room_dict
-            layout_info = room_config[room]
-            if 'layout_columns' in layout_info:
-                cols = layout_info['layout_columns']
-                rows = layout_info['layout_rows']
-            else:
-                cols = layout_info.get('columns', 6)
-                rows = layout_info.get('rows', 5)
-        else:
-            # Fallback to default layout
-            cols = 6
-            rows = 5
+        # Get room layout configuration; spill_overflow already fitted the students to it
+        seat_map = _room_layout(room, room_config)
+        rows, cols = seat_map.rows, seat_map.columns
         
-        print(f"   Layout: {rows} rows × {cols} columns = {rows * cols} seats")
+        blocked = '' if seat_map.is_full else f" ({rows * cols - seat_map.capacity} blocked)"
+        print(f"   Layout: {rows} rows × {cols} columns = {seat_map.capacity} seats{blocked}")
+
+        # Spread same-subject and same-branch students apart
+        infos = [metadata.get(student_id, {}) for student_id in queue]
+        cells, before, after = place_students(
+            _codes(info.get('Subject', 'Unknown') for info in infos),
+            _codes(info.get('Branch', 'Unknown') for info in infos),
+            rows, cols, available=seat_map.available
+        )
+        print(f"   Neighbour conflicts: {before} → {after}")
         
-        # Generate seating coordinates
+        # Generate seating coordinates, in seat order
         seats = []
-        for idx, student_id in enumerate(queue):
-            if idx >= rows * cols:
-                print(f"   ⚠️ Warning: Room capacity exceeded! Only placing first {rows * cols} students")
-                break  # Room capacity exceeded
-                
-            x = idx % cols
-            y = idx // cols
-            student_info = metadata.get(student_id, {})
+        for cell, student_id, student_info in sorted(zip(cells, queue, infos), key=lambda item: item[0]):
+            y, x = divmod(cell, cols)
             
             seat_data = {
                 'x': x,
                 'y': y,
                 'student_id': student_id,
-                'seat_no': idx + 1,
+                'seat_no': seat_map.seat_number(cell),
                 'Name': student_info.get('Name', 'Unknown'),
                 'Department': student_info.get('Department', 'Unknown'),
                 'Branch': student_info.get('Branch', 'Unknown'),
@@ -63,6 +168,8 @@ def assign_seats_in_room(room_assignment, metadata, room_config):
                 'Subject': student_info.get('Subject', 'Unknown'),
                 'ExamTime': student_info.get('ExamTime', 'Unknown')
             }
+            if student_id in spilled:
+                seat_data['spilled_from'] = spilled[student_id]
             seats.append(seat_data)
         
         seating[room] = seats
@@ -70,6 +177,119 @@ def assign_seats_in_room(room_assignment, metadata, room_config):
     
     return seating
 
+def _codes(values):
+    """Small integer code per distinct value, in first-appearance order"""
+    codes = {}
+    return [codes.setdefault(value, len(codes)) for value in values]
+
+def _conflict_pairs(grid):
+    """Boolean grids of side-by-side and front-to-back seat pairs holding the same code"""
+    occupied = grid >= 0
+    return (
+        (grid[:, 1:] == grid[:, :-1]) & occupied[:, 1:],
+        (grid[1:, :] == grid[:-1, :]) & occupied[1:, :]
+    )
+
+def neighbour_conflicts(subjects, branches):
+    """
+    Weighted count of side-by-side and front-to-back seat pairs that share a subject
+    or branch, by comparing each grid with itself shifted one seat.
+    Grids hold a category code per seat and -1 for an empty seat.
+    """
+    total = 0
+    for grid, weight in ((subjects, SUBJECT_WEIGHT), (branches, BRANCH_WEIGHT)):
+        across, behind = _conflict_pairs(grid)
+        total += weight * (int(across.sum()) + int(behind.sum()))
+    return total
+
+def _seat_conflicts(subjects, branches):
+    """Per-seat neighbour_conflicts: every conflicting pair counts at both of its seats"""
+    cost = np.zeros(subjects.shape, dtype=np.int64)
+    for grid, weight in ((subjects, SUBJECT_WEIGHT), (branches, BRANCH_WEIGHT)):
+        across, behind = _conflict_pairs(grid)
+        cost[:, 1:] += weight * across
+        cost[:, :-1] += weight * across
+        cost[1:, :] += weight * behind
+        cost[:-1, :] += weight * behind
+    return cost
+
+def place_students(subjects, branches, rows, cols, seed=0, time_limit=SEAT_SEARCH_TIME_LIMIT, available=None):
+    """
+    Choose seats for students with the given subject and branch codes so that few
+    neighbours share a subject or branch (see neighbour_conflicts).
+    Students start spread evenly over the usable seats in the given order. A bounded
+    simulated-annealing search then swaps a conflicted seat with a random other seat,
+    occupied or empty, re-scoring only the two seats' neighbourhoods; the conflicted
+    seats are re-read from the vectorized per-seat score every few hundred steps.
+    Args:
+        subjects, branches: Category code per student; at most one per usable seat
+        seed: Seed of the search, for reproducible layouts
+        time_limit: Seconds the search may run
+        available: Optional usable flag per cell (see SeatMap); blocked cells stay empty
+    Returns:
+        (seat index per student, row-major y * cols + x; conflicts before; conflicts after)
+    """
+    size, n = rows * cols, len(subjects)
+    usable = list(range(size)) if available is None else np.flatnonzero(available).tolist()
+    subject_at, branch_at, student_at = [-1] * size, [-1] * size, [-1] * size
+    spread = np.linspace(0, len(usable) - 1, n).round().astype(int).tolist() if n > 1 else [0] * n
+    for student, cell in enumerate(usable[k] for k in spread):
+        subject_at[cell], branch_at[cell], student_at[cell] = subjects[student], branches[student], student
+
+    neighbours = [
+        [c for c, ok in ((i - 1, i % cols), (i + 1, (i + 1) % cols), (i - cols, i >= cols), (i + cols, i + cols < size)) if ok]
+        for i in range(size)
+    ]
+
+    def seat_cost(i):
+        subject, branch = subject_at[i], branch_at[i]
+        if subject < 0:
+            return 0
+        return sum(
+            SUBJECT_WEIGHT * (subject_at[j] == subject) + BRANCH_WEIGHT * (branch_at[j] == branch)
+            for j in neighbours[i]
+        )
+
+    def grids():
+        return np.array(subject_at).reshape(rows, cols), np.array(branch_at).reshape(rows, cols)
+
+    current = initial = neighbour_conflicts(*grids())
+    best, best_students = current, student_at[:]
+    rng = random.Random(seed)
+    steps = SEAT_SEARCH_STEPS * size
+    refresh = max(64, size // 4)
+    deadline = time.perf_counter() + time_limit
+    conflicted = []
+    for step in range(steps):
+        if current == 0:
+            break
+        if step % refresh == 0:
+            if time.perf_counter() > deadline:
+                break
+            conflicted = np.flatnonzero(_seat_conflicts(*grids())).tolist()
+        p, q = rng.choice(conflicted), usable[rng.randrange(len(usable))]
+        if subject_at[p] == subject_at[q] and branch_at[p] == branch_at[q]:
+            continue
+        old = seat_cost(p) + seat_cost(q)
+        subject_at[p], subject_at[q] = subject_at[q], subject_at[p]
+        branch_at[p], branch_at[q] = branch_at[q], branch_at[p]
+        delta = seat_cost(p) + seat_cost(q) - old
+        temperature = SEAT_SEARCH_TEMPERATURE * (1 - step / steps) + 0.01
+        if delta <= 0 or rng.random() < math.exp(-delta / temperature):
+            student_at[p], student_at[q] = student_at[q], student_at[p]
+            current += delta
+            if current < best:
+                best, best_students = current, student_at[:]
+        else:
+            subject_at[p], subject_at[q] = subject_at[q], subject_at[p]
+            branch_at[p], branch_at[q] = branch_at[q], branch_at[p]
+
+    cells = [0] * n
+    for cell, student in enumerate(best_students):
+        if student >= 0:
+            cells[student] = cell
+    return cells, initial, best
+
 def interleave_groups(groups):
     """Interleave students from different groups while maintaining year clusters"""
     # Filter out empty groups
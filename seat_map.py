@@ -0,0 +1,79 @@
+import numpy as np
+
+SEAT = '#'
+BLOCKED = '.'
+
+class SeatMap:
+    """
+    Which positions of a rows × columns room grid hold a usable seat.
+    Stored in room_configs.seat_map as hex of the row-major availability bits (bit
+    y * columns + x, least significant first, 1 = seat); NULL means every position
+    is a seat. Seats are numbered in row-major order over usable positions only, and
+    both directions between seat numbers and grid cells are array lookups.
+    """
+
+    def __init__(self, rows, columns, available=None):
+        self.rows = rows
+        self.columns = columns
+        size = rows * columns
+        self.available = np.ones(size, dtype=bool) if available is None else np.asarray(available, dtype=bool).reshape(size)
+        self.cells = np.flatnonzero(self.available)  # seat index -> cell
+        self.seat_of_cell = np.cumsum(self.available) - 1  # cell -> seat index (where available)
+
+    @classmethod
+    def from_hex(cls, rows, columns, encoded):
+        """Decode the stored bitmap; an empty value is a full rectangle"""
+        if not encoded:
+            return cls(rows, columns)
+        bits = np.unpackbits(np.frombuffer(bytes.fromhex(encoded), dtype=np.uint8), bitorder='little')
+        if len(bits) < rows * columns:
+            raise ValueError(f"Seat map has {len(bits)} positions, layout needs {rows * columns}")
+        return cls(rows, columns, bits[:rows * columns])
+
+    @classmethod
+    def from_text(cls, text):
+        """
+        Parse an admin-drawn map: one line per row, '#' for a seat and '.' for a
+        pillar, aisle or broken bench. Short lines are padded with blocked positions.
+        """
+        lines = [line.strip() for line in text.strip().splitlines() if line.strip()]
+        if not lines:
+            raise ValueError("Seat map is empty")
+        unknown = set(''.join(lines)) - {SEAT, BLOCKED}
+        if unknown:
+            raise ValueError(f"Seat map may only contain '{SEAT}' and '{BLOCKED}', found {''.join(sorted(unknown))}")
+        columns = max(len(line) for line in lines)
+        available = [[char == SEAT for char in line.ljust(columns, BLOCKED)] for line in lines]
+        return cls(len(lines), columns, available)
+
+    def to_hex(self):
+        return np.packbits(self.available, bitorder='little').tobytes().hex()
+
+    def to_text(self):
+        grid = self.available.reshape(self.rows, self.columns)
+        return '\n'.join(''.join(SEAT if seat else BLOCKED for seat in row) for row in grid)
+
+    @property
+    def capacity(self):
+        return len(self.cells)
+
+    @property
+    def is_full(self):
+        return self.capacity == self.rows * self.columns
+
+    def coordinates(self, seat):
+        """(x, y) of seat index seat"""
+        y, x = divmod(int(self.cells[seat]), self.columns)
+        return x, y
+
+    def seat_number(self, cell):
+        """1-based seat number of a usable grid cell"""
+        return int(self.seat_of_cell[cell]) + 1
+
+def room_seat_map(config):
+    """SeatMap of a room config dict, or None when it has no layout (e.g. synthetic rooms)"""
+    rows = config.get('layout_rows', config.get('rows'))
+    columns = config.get('layout_columns', config.get('columns'))
+    if not rows or not columns:
+        return None
+    return SeatMap.from_hex(rows, columns, config.get('seat_map'))
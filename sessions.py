@@ -0,0 +1,273 @@
+import contextlib
+import io
+import itertools
+import os
+import re
+import time
+from collections import defaultdict
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, as_completed, wait
+import pandas as pd
+from conflict_graph import extract_student_metadata
+from room_assignment import SEARCH_TIME_LIMIT, SearchBudgetExceeded, assign_rooms_to_groups
+from seat_layout import assign_seats_in_room, spill_overflow
+from visualization import create_simple_html_visualization, metadata_categories
+
+SESSION_KEY = ('ExamDate', 'ExamTime')
+
+def session_label(values):
+    """Filesystem-safe name of a session, e.g. 2025-06-01_Morning"""
+    label = re.sub(r'[^A-Za-z0-9._-]+', '-', '_'.join(str(value) for value in values)).strip('-')
+    return label or 'session'
+
+def session_room_key(label, room):
+    """Key of a room in a layout that spans sessions; also its path below exports/ and visualizations/"""
+    return f"{label}/{room}"
+
+def room_of(key):
+    """Room name of a session_room_key; plain room names pass through"""
+    return key.rsplit('/', 1)[-1]
+
+def split_sessions(df, key=SESSION_KEY):
+    """
+    Rows of every exam session, in order of first appearance.
+    A student sitting exams in several sessions has a row in each of them.
+    Args:
+        df: Student DataFrame (or CSV path) with StudentID and the key columns
+        key: Columns that identify a session
+    Returns:
+        Dictionary of {session label: DataFrame of the session's rows}
+    """
+    if isinstance(df, str):
+        df = pd.read_csv(df)
+    sessions = {}
+    for values, rows in df.groupby(list(key), sort=False):
+        label = session_label(values)
+        if label in sessions: # Two sessions that only differ in punctuation
+            label = f"{label}-{len(sessions)}"
+        sessions[label] = rows
+    return sessions
+
+def session_tasks(groups, sessions):
+    """
+    Yields (label, groups, metadata) per session: the colored groups restricted to
+    the session's students, and metadata built from the session's own rows (so a
+    student shows the subject they sit in that session).
+    """
+    color_of = {sid: color for color, group in groups.items() for sid in group}
+    for label, rows in sessions.items():
+        session_groups = defaultdict(list)
+        for sid in dict.fromkeys(rows['StudentID'].tolist()):
+            session_groups[color_of[sid]].append(sid)
+        yield label, dict(session_groups), extract_student_metadata(rows)
+
+def solve_session(groups, metadata, rooms_config, fit_policy='worst_fit', previous_assignment=None, workers=1,
+                  time_limit=SEARCH_TIME_LIMIT, node_limit=None):
+    """
+    Rooms for one session, with every room available to it; with a
+    previous_assignment ({room: [student_ids]}) the earlier plan is repaired instead.
+    Students a room has no seat for move to another room of the session (see
+    spill_overflow); seats are placed afterwards, room by room (see solve_rooms).
+    workers is the process count of the heuristic portfolio (see portfolio_assign);
+    time_limit and node_limit bound the exact search (see search_room_assignment).
+    Output is captured so sessions solved in parallel do not interleave their logs.
+    Returns:
+        Dictionary with 'rooms' ({room: [student_ids]}), 'report' (see
+        assign_rooms_to_groups, plus 'spilled': students moved for lack of seats),
+        'unplaced' (students no room could seat, see spill_overflow), 'error'
+        (message when no assignment was found, else None) and 'log' (everything
+        printed while solving). When the exact search ran out of budget, 'rooms'
+        holds its best partial assignment and 'unplaced' the students it left out,
+        alongside the error
+    """
+    log = io.StringIO()
+    outcome = {'rooms': {}, 'report': {}, 'unplaced': [], 'error': None}
+    with contextlib.redirect_stdout(log):
+        try:
+            rooms = assign_rooms_to_groups(
+                groups, metadata, rooms_config,
+                time_limit=time_limit, node_limit=node_limit,
+                fit_policy=fit_policy, workers=workers, report=outcome['report'],
+                previous_assignment=previous_assignment
+            )
+            outcome['rooms'], spilled = spill_overflow(
+                rooms, metadata, {room['room_name']: room for room in rooms_config}, outcome['unplaced']
+            )
+            outcome['report']['spilled'] = len(spilled)
+        except SearchBudgetExceeded as e:
+            outcome['error'] = str(e)
+            outcome['rooms'] = e.result.assignments
+            outcome['unplaced'] = [
+                {'student_id': sid, 'room': None, 'reason': 'the room search ran out of budget before placing its group'}
+                for group in e.result.unplaced for sid in group.student_ids
+            ]
+        except ValueError as e:
+            outcome['error'] = str(e)
+    outcome['log'] = log.getvalue()
+    return outcome
+
+def solve_sessions(tasks, rooms_config, fit_policy='worst_fit', workers=None, previous=None,
+                   time_limit=SEARCH_TIME_LIMIT, node_limit=None):
+    """
+    Solve sessions independently, in parallel worker processes.
+    Args:
+        tasks: (label, groups, metadata) per session, as from session_tasks
+        rooms_config: List of room configuration dictionaries, shared by all sessions
+        fit_policy: Room order of the greedy pass, one of FIT_POLICIES
+        workers: Process count (default: CPU count); 1 solves in order in-process.
+            Processes not needed for sessions run each session's heuristic portfolio
+        previous: Optional {label: {room: [student_ids]}} of the last published plan,
+            to warm-start each session from
+        time_limit: Seconds each session's exact search may run (None for no limit)
+        node_limit: Search nodes each session's exact search may visit (None for no limit)
+    Yields:
+        (label, outcome) as each session finishes; see solve_session
+    """
+    tasks = list(tasks)
+    previous = previous or {}
+    budget = workers or os.cpu_count() or 1
+    workers = min(budget, len(tasks))
+    portfolio_workers = max(1, budget // max(workers, 1))
+    if workers <= 1:
+        for label, groups, metadata in tasks:
+            yield label, solve_session(
+                groups, metadata, rooms_config, fit_policy, previous.get(label), portfolio_workers, time_limit, node_limit
+            )
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(
+                solve_session, groups, metadata, rooms_config, fit_policy, previous.get(label), portfolio_workers,
+                time_limit, node_limit
+            ): label
+            for label, groups, metadata in tasks
+        }
+        for future in as_completed(futures):
+            yield futures[future], future.result()
+
+def room_tasks(label, rooms, metadata, rooms_config, export=True, render=True):
+    """
+    One task per occupied room of a session, for solve_rooms. A task carries only
+    its own students' metadata (plus the session's legend categories), so it is
+    cheap to ship to a worker process.
+    Args:
+        label: Session label
+        rooms: {room: [student_ids]} of the session
+        metadata: Session metadata
+        rooms_config: List of room configuration dictionaries
+        export: Write exports/<label>/<room>_seating.csv
+        render: Write visualizations/<label>/<room>.html
+    """
+    configs = {room['room_name']: room for room in rooms_config}
+    categories = metadata_categories(metadata) if render else None
+    for room, students in rooms.items():
+        if not students:
+            continue
+        yield {
+            'label': label,
+            'room': room,
+            'students': students,
+            'metadata': {sid: metadata.get(sid, {}) for sid in students},
+            'room_config': configs.get(room),
+            'categories': categories,
+            'csv_path': f"exports/{label}/{room}_seating.csv" if export else None,
+            'html_path': f"visualizations/{label}/{room}.html" if render else None
+        }
+
+def export_room_csv(csv_path, room, seats, metadata):
+    """Write one room's seating, in seat order, as CSV"""
+    room_data = []
+    for seat in seats:
+        student_id = seat['student_id']
+        info = metadata.get(student_id, {})
+        room_data.append({
+            'SeatNo': seat['seat_no'],
+            'StudentID': student_id,
+            'Name': info.get('Name', 'Unknown'),
+            'Department': info.get('Department', 'Unknown'),
+            'Branch': info.get('Branch', 'Unknown'),
+            'Batch': info.get('Batch', 'Unknown'),
+            'Year': info.get('Year', 'Unknown'),
+            'Semester': info.get('Semester', 'Unknown'),
+            'Subject': info.get('Subject', 'Unknown'),
+            'ExamDate': info.get('ExamDate', 'Unknown'),
+            'ExamTime': info.get('ExamTime', 'Unknown'),
+            'Room': room,
+            'Position_X': seat['x'],
+            'Position_Y': seat['y']
+        })
+    os.makedirs(os.path.dirname(csv_path), exist_ok=True)
+    pd.DataFrame(room_data).to_csv(csv_path, index=False)
+
+def solve_room(task):
+    """
+    Seat one room, then write its CSV export and HTML map if the task asks for them.
+    Returns:
+        Dictionary with 'seats' (as from assign_seats_in_room), 'unplaced' (students
+        beyond the room's seats, when it was not fitted by solve_session), 'files'
+        (paths written), 'timing' (seconds spent on 'seats', 'csv' and 'html'),
+        'error' (message of the step that failed, else None) and 'log'
+    """
+    room, config = task['room'], task['room_config']
+    log = io.StringIO()
+    outcome = {'seats': [], 'unplaced': [], 'files': [], 'timing': {}, 'error': None}
+    with contextlib.redirect_stdout(log):
+        try:
+            start = time.perf_counter()
+            layout = assign_seats_in_room(
+                {room: task['students']}, task['metadata'], {room: config} if config else {}, outcome['unplaced']
+            )
+            outcome['seats'] = layout.get(room, [])
+            outcome['timing']['seats'] = time.perf_counter() - start
+
+            if task['csv_path']:
+                start = time.perf_counter()
+                export_room_csv(task['csv_path'], room, outcome['seats'], task['metadata'])
+                outcome['files'].append(task['csv_path'])
+                outcome['timing']['csv'] = time.perf_counter() - start
+
+            if task['html_path']:
+                start = time.perf_counter()
+                html_content = create_simple_html_visualization(
+                    room_name=room,
+                    seating_arrangement=outcome['seats'],
+                    metadata=task['metadata'],
+                    room_config=config,
+                    categories=task['categories']
+                )
+                os.makedirs(os.path.dirname(task['html_path']), exist_ok=True)
+                with open(task['html_path'], 'w') as f:
+                    f.write(html_content)
+                outcome['files'].append(task['html_path'])
+                outcome['timing']['html'] = time.perf_counter() - start
+        except Exception as e:
+            outcome['error'] = str(e)
+    outcome['log'] = log.getvalue()
+    return outcome
+
+def solve_rooms(tasks, workers=None):
+    """
+    Run solve_room for every task on a pool of at most workers processes. At most
+    two tasks per worker are in flight, so a large plan is not pickled all at once.
+    Args:
+        tasks: Room tasks, as from room_tasks
+        workers: Process count (default: CPU count); 1 runs in order in-process
+    Returns:
+        List of (task, outcome) in task order, however the rooms finish
+    """
+    tasks = list(tasks)
+    workers = min(workers or os.cpu_count() or 1, len(tasks))
+    if workers <= 1:
+        return [(task, solve_room(task)) for task in tasks]
+
+    outcomes = [None] * len(tasks)
+    queued = iter(enumerate(tasks))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = {pool.submit(solve_room, task): index for index, task in itertools.islice(queued, 2 * workers)}
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                outcomes[pending.pop(future)] = future.result()
+            for index, task in itertools.islice(queued, len(done)):
+                pending[pool.submit(solve_room, task)] = index
+    return list(zip(tasks, outcomes))
@@ -0,0 +1,131 @@
+import numpy as np
+
+class CSRGraph:
+    """
+    Undirected graph with integer node ids stored as CSR arrays.
+    The neighbours of node i are indices[indptr[i]:indptr[i + 1]], sorted ascending;
+    nodes[i] is the original label (e.g. the StudentID) of node i.
+    Self-loops are kept out of the neighbour lists, since a student never conflicts
+    with themselves, but loops[i] records that node i had one (networkx counts it
+    twice in the degree).
+    """
+
+    def __init__(self, nodes, indptr, indices, loops=None):
+        self.nodes = list(nodes)
+        self.indptr = indptr
+        self.indices = indices
+        self.loops = np.zeros(len(self.nodes), dtype=bool) if loops is None else loops
+
+    @classmethod
+    def from_edges(cls, nodes, src, dst):
+        """Build from parallel arrays of node ids; duplicate and reversed edges are merged"""
+        n = len(nodes)
+        src = np.asarray(src, dtype=np.int64)
+        dst = np.asarray(dst, dtype=np.int64)
+        keep = src != dst
+        loops = np.zeros(n, dtype=bool)
+        loops[src[~keep]] = True
+        src, dst = src[keep], dst[keep]
+
+        keys = np.unique(np.concatenate([src * n + dst, dst * n + src]))
+        rows, cols = np.divmod(keys, n) if n else (keys, keys)
+
+        indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=n), out=indptr[1:])
+        return cls(nodes, indptr, cols.astype(np.int32), loops)
+
+    @classmethod
+    def from_cliques(cls, nodes, cliques):
+        """
+        Expand groups of mutually conflicting nodes into explicit edges.
+        Costs O(sum k²) for cliques of size k, so prefer the implicit clique
+        coloring in conflict_graph when the conflict rule is a plain slot key.
+        A node listed twice in one clique gets a self-loop, as networkx would give it.
+        """
+        # Pair every position with every other one, so only repeated nodes pair with themselves
+        off_diagonal = [~np.eye(len(members), dtype=bool).ravel() for members in cliques]
+        src = [np.repeat(members, len(members))[off] for members, off in zip(cliques, off_diagonal)]
+        dst = [np.tile(members, len(members))[off] for members, off in zip(cliques, off_diagonal)]
+        empty = np.empty(0, dtype=np.int64)
+        return cls.from_edges(
+            nodes,
+            np.concatenate(src) if src else empty,
+            np.concatenate(dst) if dst else empty
+        )
+
+    @classmethod
+    def from_networkx(cls, G):
+        """Adapter from a networkx.Graph; node labels are kept in G.nodes order"""
+        nodes = list(G.nodes)
+        index = {node: i for i, node in enumerate(nodes)}
+        edges = np.array([(index[u], index[v]) for u, v in G.edges()], dtype=np.int64).reshape(-1, 2)
+        return cls.from_edges(nodes, edges[:, 0], edges[:, 1])
+
+    def to_networkx(self):
+        """Adapter to a networkx.Graph with the original node labels (requires networkx)"""
+        import networkx as nx
+
+        G = nx.Graph()
+        G.add_nodes_from(self.nodes)
+        rows = np.repeat(np.arange(self.num_nodes), np.diff(self.indptr))
+        upper = rows < self.indices
+        G.add_edges_from(
+            (self.nodes[u], self.nodes[v])
+            for u, v in zip(rows[upper].tolist(), self.indices[upper].tolist())
+        )
+        G.add_edges_from((self.nodes[v], self.nodes[v]) for v in np.flatnonzero(self.loops).tolist())
+        return G
+
+    @property
+    def num_nodes(self):
+        return len(self.nodes)
+
+    @property
+    def num_edges(self):
+        return len(self.indices) // 2 + int(self.loops.sum())
+
+    def degrees(self):
+        return np.diff(self.indptr)
+
+    def neighbors(self, i):
+        return self.indices[self.indptr[i]:self.indptr[i + 1]]
+
+    def connected_components(self):
+        """
+        Label every node with the smallest node id of its component.
+        Vectorized hook-and-jump (Shiloach-Vishkin style), O((V + E) log V).
+        """
+        n = self.num_nodes
+        labels = np.arange(n)
+        rows = np.repeat(labels, np.diff(self.indptr))
+        while True:
+            hooked = labels.copy()
+            np.minimum.at(hooked, labels[rows], labels[self.indices])
+            while True:
+                jumped = hooked[hooked]
+                if np.array_equal(jumped, hooked):
+                    break
+                hooked = jumped
+            if np.array_equal(hooked, labels):
+                return labels
+            labels = hooked
+
+    def subgraph(self, node_ids):
+        """Induced subgraph on node_ids (ascending), relabeled to 0..k-1"""
+        node_ids = np.asarray(node_ids, dtype=np.int64)
+        remap = np.full(self.num_nodes, -1, dtype=np.int64)
+        remap[node_ids] = np.arange(len(node_ids))
+
+        starts = self.indptr[node_ids]
+        counts = self.indptr[node_ids + 1] - starts
+        offsets = np.repeat(starts - np.concatenate([[0], np.cumsum(counts)[:-1]]), counts)
+        positions = np.arange(counts.sum()) + offsets
+        rows = np.repeat(np.arange(len(node_ids)), counts)
+        cols = remap[self.indices[positions]]
+        keep = cols >= 0
+
+        indptr = np.zeros(len(node_ids) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows[keep], minlength=len(node_ids)), out=indptr[1:])
+        return CSRGraph(
+            [self.nodes[i] for i in node_ids.tolist()], indptr, cols[keep].astype(np.int32), self.loops[node_ids]
+        )
@@ -0,0 +1,74 @@
+import hashlib
+import json
+import os
+import pickle
+
+CACHE_DIR = 'data/cache'
+
+def fingerprint(*parts):
+    """
+    SHA-256 over the given inputs.
+    Bytes are hashed as-is; anything else (room config rows, option values, keys of
+    upstream stages) is hashed through its canonical JSON form.
+    """
+    digest = hashlib.sha256()
+    for part in parts:
+        if not isinstance(part, bytes):
+            part = json.dumps(part, sort_keys=True, default=str).encode()
+        digest.update(len(part).to_bytes(8, 'little'))
+        digest.update(part)
+    return digest.hexdigest()
+
+class StageCache:
+    """
+    Content-addressed store for pipeline stage outputs: data/cache/<stage>/<key>.pkl.
+    Every stage's key hashes its own inputs together with the key of the stage it
+    reads from, so a changed input invalidates exactly the stages downstream of it.
+    Entries are written atomically as soon as a stage finishes, which makes a
+    crashed run resume from the last finished stage on the next run.
+    """
+
+    def __init__(self, root=CACHE_DIR, enabled=True):
+        self.root = root
+        self.enabled = enabled
+
+    def _path(self, stage, key):
+        return os.path.join(self.root, stage, f"{key}.pkl")
+
+    def load(self, stage, key):
+        """Returns (hit, value); unreadable entries count as misses"""
+        if not self.enabled:
+            return False, None
+        try:
+            with open(self._path(stage, key), 'rb') as f:
+                return True, pickle.load(f)
+        except FileNotFoundError:
+            return False, None
+        except Exception as e:
+            print(f"⚠️ Ignoring unreadable cache entry for {stage}: {e}")
+            return False, None
+
+    def store(self, stage, key, value):
+        if not self.enabled:
+            return
+        path = self._path(stage, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+
+def file_fingerprints(paths):
+    """{path: hash of its bytes} for output files written by a stage"""
+    fingerprints = {}
+    for path in paths:
+        with open(path, 'rb') as f:
+            fingerprints[path] = fingerprint(f.read())
+    return fingerprints
+
+def files_unchanged(fingerprints):
+    """True when every recorded output file still exists with the recorded content"""
+    try:
+        return file_fingerprints(fingerprints) == fingerprints
+    except OSError:
+        return False
@@ -1,9 +1,22 @@
 import html
 
-def create_simple_html_visualization(room_name, seating_arrangement, metadata, room_config):
-    departments = list(set([v.get('Department', 'Unknown') for v in metadata.values()]))
-    years = sorted(set([v.get('Year', '') for v in metadata.values() if 'Year' in v]))
-    branches = sorted(set([v.get('Branch', '') for v in metadata.values() if 'Branch' in v]))
+def metadata_categories(metadata):
+    """Departments, years and branches across all students, for the legend and filters"""
+    if hasattr(metadata, 'distinct'):
+        # Columnar StudentStore: read distinct values without materializing every row
+        departments = list(metadata.distinct('Department'))
+        years = sorted(metadata.distinct('Year'))
+        branches = sorted(metadata.distinct('Branch'))
+    else:
+        departments = list(set([v.get('Department', 'Unknown') for v in metadata.values()]))
+        years = sorted(set([v.get('Year', '') for v in metadata.values() if 'Year' in v]))
+        branches = sorted(set([v.get('Branch', '') for v in metadata.values() if 'Branch' in v]))
+    return departments, years, branches
+
+def create_simple_html_visualization(room_name, seating_arrangement, metadata, room_config, categories=None):
+    # categories (see metadata_categories) lets a room rendered from only its own
+    # students' metadata keep the session-wide legend and colors
+    departments, years, branches = categories or metadata_categories(metadata)
 
     colors = ['#636efa', '#ef553b', '#00cc96', '#ab63fa', '#ffa15a',
               '#19d3f3', '#ff6692', '#b6e880', '#ff97ff', '#fecb52']